@@ -1,7 +1,12 @@
-import spacy
-import re
-nlp = spacy.load('en_core_web_sm')
-spacy_model = spacy.load("en_core_web_lg")
+from model_registry import run_pipeline, SMALL_MODEL, LARGE_MODEL
+from sentence_helper import imperative_to_clause
+from sentence_analysis import analyze
+from spacy.tokens import Span, Token
+from keyword_matcher import KeywordMatcher
+
+# pipeline profiles (see model_registry.PROFILES)
+VERB_PROFILE = "tagger"       # findAllVerbSingle: POS and lemmas
+RELATION_PROFILE = "parser"   # findRelationVerb*: noun_chunks and lemmas
 
 def findTool(ListSentence):
     # Yifan: 
@@ -9,7 +14,7 @@ def findTool(ListSentence):
     # - Preheat an air fryer to 400 degrees F (200 degrees C) according to manufacturer’s instructions. ([])
     toolList = []
     for i in range(len(ListSentence)):
-        single = findToolSingle(imperative_to_normal(ListSentence[i]))
+        single = findToolSingle(imperative_to_clause(ListSentence[i]))
         if single == [] and i > 0:
             single = toolList[-1]
         toolList.append(single)
@@ -19,8 +24,8 @@ def findMethod(ListSentence):
     prime = []
     verbs = []
     for i in ListSentence:
-        single1 = list(set(findRelationVerbSingle(imperative_to_normal(i))))
-        single2 = list(set(findMethodSingle(imperative_to_normal(i))))
+        single1 = list(set(findRelationVerbDoc(analyze(i).clause_doc(RELATION_PROFILE))))
+        single2 = list(set(findMethodSingle(imperative_to_clause(i))))
         prime.append(single2) 
         for j in single1:
             if j in tool_method_list["bad_verb"]:
@@ -33,7 +38,7 @@ def findMethod(ListSentence):
 def answerVague(sen):
     # Yifan: fix bug: "Preheat the oven to 350 degrees F (175 degrees C)." (index1 = sen.index(item[0]) ValueError: substring not found)
     try:
-        RelationList = findRelationVerbNoun(imperative_to_normal(sen))
+        RelationList = findRelationVerbNounDoc(analyze(sen).clause_doc(RELATION_PROFILE))
         temp = []
         temp2 = []
         returnList = []
@@ -64,30 +69,19 @@ def answerVague(sen):
 #===================================================
 #find tool
 def findToolSingle(sentence):
-    toolList = []
-    sentence = sentence.lower()
-    for i in tool_method_list["cooking_tools"]:
-        if match_whole_word(sentence, i):
-            toolList.append(i)
-            if " " in i:
-                j = i.replace(" ", "")
-                sentence = sentence.replace(i, j)
-    return toolList
+    # one scan for all tools, a tool inside a longer one is skipped ("pan" in "roasting pan")
+    return tool_matcher.find(sentence.lower())
 
 
 #find primary cooking method
 def findMethodSingle(sentence):
-    methodllist = []
-    sentence = sentence.lower()
-    for i in tool_method_list["cooking_methods"]:
-        if match_whole_word(sentence, i):
-            methodllist.append(i)
-    return methodllist
+    # one scan for all methods, a method inside a longer one is kept ("stir" in "stir-fry")
+    return method_matcher.find(sentence.lower())
 
 
 #find verb method 1
 def findAllVerbSingle(sentence):
-    doc = nlp(sentence)
+    doc = run_pipeline(SMALL_MODEL, sentence, VERB_PROFILE)
     verbs = []
     for token in doc:
         if token.pos_ == "VERB" and not token.text.endswith("ed"):
@@ -97,8 +91,10 @@ def findAllVerbSingle(sentence):
 
 #find verb method 2
 def findRelationVerbSingle(sentence):
+    return findRelationVerbDoc(run_pipeline(LARGE_MODEL, sentence, RELATION_PROFILE))
+
+def findRelationVerbDoc(spacy_output):
     verbs = []
-    spacy_output = spacy_model(sentence)
     for n in spacy_output.noun_chunks:
         if n.text == "You":
             continue
@@ -109,8 +105,10 @@ def findRelationVerbSingle(sentence):
 
 #find verb noun relation
 def findRelationVerbNoun(sentence):
+    return findRelationVerbNounDoc(run_pipeline(LARGE_MODEL, sentence, RELATION_PROFILE))
+
+def findRelationVerbNounDoc(spacy_output):
     verblist = []
-    spacy_output = spacy_model(sentence)
     for n in spacy_output.noun_chunks:
         if n.text == "You":
             continue
@@ -119,7 +117,7 @@ def findRelationVerbNoun(sentence):
             verblist.append([verb,n])
     return verblist
 
-def find_most_related_verb(noun_chunk: spacy.tokens.Span) -> [spacy.tokens.Token, None]:
+def find_most_related_verb(noun_chunk: Span) -> [Token, None]:
     cur_token = noun_chunk.root
 
     while cur_token.head.pos_ != "VERB":
@@ -128,33 +126,6 @@ def find_most_related_verb(noun_chunk: spacy.tokens.Span) -> [spacy.tokens.Token
         cur_token = cur_token.head
     return cur_token.head
 
-#match
-def match_whole_word(text, word):
-    # The pattern will look for the word surrounded by word boundaries
-    pattern = r'\b' + re.escape(word) + r'(|ing)\b'
-    return re.search(pattern, text) is not None
-
-#normalization
-def imperative_to_normal(sentence: str) -> str:
-    try:        
-        while sentence.startswith(" "):
-            sentence = sentence[1:]
-        if sentence == '' or sentence.startswith("You"):
-            return sentence
-        if "," in sentence:
-            i = sentence.index(",")
-            if " " not in sentence[:i]:
-                sentence = sentence[i+2 :]
-        if sentence.endswith("."):
-            return f"You {sentence[0].lower()}{sentence[1:]}"
-        else:
-            return f"You {sentence[0].lower()}{sentence[1:]}."
-    
-    except Exception:
-        return sentence
-
-
-
 #keywordlist
 tool_method_list = {
   "cooking_tools": [
@@ -247,3 +218,7 @@ tool_method_list = {
     "heat"
   ]
 }
+
+# vocabularies compiled once into single-scan matchers (whole words, optionally followed by "ing", see KeywordMatcher)
+tool_matcher = KeywordMatcher(tool_method_list["cooking_tools"], longest_match=True)
+method_matcher = KeywordMatcher(tool_method_list["cooking_methods"], longest_match=False)
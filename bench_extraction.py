@@ -0,0 +1,50 @@
+import argparse
+import time
+from typing import Callable, List
+
+from bs4 import BeautifulSoup
+
+from web import get_raw_ingredients_from_soup, get_raw_steps_from_soup
+from ingredient import Ingredient
+from extraction import extract_recipe_parts, default_backend
+
+def original_path(html: bytes) -> List[str]:
+    """get_soup_from_url + get_raw_*_from_soup + Ingredient: full html.parser tree and three finds per ingredient."""
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.find("title").get_text()
+    ingredients = [Ingredient(tag) for tag in get_raw_ingredients_from_soup(soup)]
+    steps = [tag.text for tag in get_raw_steps_from_soup(soup)]
+    return [title] + [repr(ingredient) for ingredient in ingredients] + steps
+
+def fast_path(html: bytes, backend: str) -> List[str]:
+    # json-ld is skipped: its ingredient lines are split differently than the spans, so the outputs wouldn't compare
+    title, raw_ingredients, steps = extract_recipe_parts(html, "utf-8", backend, use_jsonld=False)
+    ingredients = [Ingredient(raw) for raw in raw_ingredients]
+    return [title] + [repr(ingredient) for ingredient in ingredients] + steps
+
+def time_it(run: Callable[[], List[str]], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the original BeautifulSoup extraction with extraction.py on saved recipe pages.")
+    parser.add_argument("pages", nargs="+", help="saved allrecipes html files")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    backend = default_backend()
+    for path in args.pages:
+        with open(path, "rb") as f:
+            html = f.read()
+        same = original_path(html) == fast_path(html, backend)
+        original_seconds = time_it(lambda: original_path(html), args.repeat)
+        fast_seconds = time_it(lambda: fast_path(html, backend), args.repeat)
+        print(f"{path} ({len(html) / 1024:.0f} KB)")
+        print(f"  html.parser + select + find: {original_seconds * 1000:.1f} ms")
+        print(f"  {backend} extraction:{' ' * max(0, 16 - len(backend))}{fast_seconds * 1000:.1f} ms ({original_seconds / fast_seconds:.1f}x)")
+        print(f"  same output: {same}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from typing import Iterable, Iterator, Tuple, Union
+
+from snapshot import iter_snapshots
+from sentence_analysis import DEFAULT_BATCH_SIZE
+from recipe import Recipe
+
+def load_corpus(paths: Iterable[str], encoding: str = "utf-8", batch_size: int = DEFAULT_BATCH_SIZE,
+                skip_errors: bool = True) -> Iterator[Tuple[str, Union[Recipe, Exception]]]:
+    """
+    Yields (name, recipe) for every saved page under the given paths (see snapshot.iter_snapshots), one page at a time.
+
+    Pages are parsed with Recipe.from_html, so no network is used. With skip_errors, a page that fails to parse
+    yields its exception instead of the recipe and the corpus goes on.
+    """
+    for name, html in iter_snapshots(paths):
+        try:
+            yield name, Recipe.from_html(html, encoding, batch_size)
+        except Exception as e:
+            if not skip_errors:
+                raise
+            yield name, e
+
+if __name__ == "__main__":
+    import sys
+
+    for name, recipe in load_corpus(sys.argv[1:]):
+        if isinstance(recipe, Exception):
+            print(f"{name}: Error: {recipe}")
+        else:
+            print(f"{name}: {recipe.recipe_name} ({len(recipe.ingredients)} ingredients, {recipe.num_actions} actions)")
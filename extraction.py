@@ -0,0 +1,159 @@
+import html as html_lib
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from ingredient import RawIngredient, raw_ingredient_from_tag, raw_ingredient_from_text
+
+try:
+    import lxml.html
+except ImportError:   # optional dependency, the html.parser backend is used instead
+    lxml = None
+
+INGREDIENTS_ID = "mntl-structured-ingredients_1-0"
+STEPS_ID = "mntl-sc-block_2-0"
+INGREDIENT_SPAN_ATTRIBUTES = ("data-ingredient-quantity", "data-ingredient-unit", "data-ingredient-name")
+
+TITLE_RE = re.compile(rb"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+JSONLD_RE = re.compile(rb"<script[^>]*type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r"<[^>]+>")
+
+# (title, raw ingredients, step texts)
+RecipeParts = Tuple[str, List[RawIngredient], List[str]]
+
+def default_backend() -> str:
+    return "lxml" if lxml is not None else "html.parser"
+
+def charset_from_content_type(content_type: Optional[str], default: str = "utf-8") -> str:
+    """Returns the charset of a Content-Type header (e.g. "text/html; charset=utf-8")."""
+    if content_type:
+        for part in content_type.split(";")[1:]:
+            key, _, value = part.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip('"\'')
+    return default
+
+def extract_recipe_parts(html: bytes, encoding: str = "utf-8", backend: Optional[str] = None, use_jsonld: bool = True) -> RecipeParts:
+    """
+    Returns the title, the raw ingredients and the step texts of a recipe page. If not found, raise exception.
+
+    The ingredient and step nodes are selected with one of the backends:
+    - lxml: parses the page in C with the given encoding (no charset sniffing) and only walks the nodes
+      selected by xpath, reading the ingredient spans in one pass per line
+    - html.parser: the original BeautifulSoup path, used when lxml is not installed
+
+    The schema.org Recipe embedded as json-ld is only a fallback for the pages without these nodes (its
+    ingredient lines are split heuristically, not by the quantity/unit/name spans). A page without the
+    ingredients node id is read from the json-ld first, without building any DOM.
+    """
+    jsonld_tried = False
+    if use_jsonld and INGREDIENTS_ID.encode() not in html:
+        parts = extract_from_jsonld(html, encoding)
+        if parts is not None:
+            return parts
+        jsonld_tried = True
+    backend = backend or default_backend()
+    if backend == "lxml":
+        title, raw_ingredients, step_texts = extract_with_lxml(html, encoding)
+    else:
+        title, raw_ingredients, step_texts = extract_with_soup(html, encoding)
+    if use_jsonld and not jsonld_tried and (title is None or not raw_ingredients or not step_texts):
+        parts = extract_from_jsonld(html, encoding)
+        if parts is not None:
+            return parts
+    if title is None:
+        raise Exception("No title found.")
+    if not raw_ingredients:
+        raise Exception("No ingredients found.")
+    if not step_texts:
+        raise Exception("No steps found.")
+    return title, raw_ingredients, step_texts
+
+def extract_with_lxml(html: bytes, encoding: str) -> Tuple[Optional[str], List[RawIngredient], List[str]]:
+    parser = lxml.html.HTMLParser(encoding=encoding)
+    root = lxml.html.document_fromstring(html, parser=parser)
+
+    titles = root.xpath("//title")
+    title = titles[0].text_content() if titles else None
+
+    raw_ingredients = []
+    for p in root.xpath(f'//*[@id="{INGREDIENTS_ID}"]/ul/li/p'):
+        spans = {}
+        for span in p.iter("span"):
+            for attribute in INGREDIENT_SPAN_ATTRIBUTES:
+                if span.get(attribute) == "true" and attribute not in spans:
+                    spans[attribute] = span.text_content()
+        raw_ingredients.append(RawIngredient(p.text_content(), *(spans.get(attribute) for attribute in INGREDIENT_SPAN_ATTRIBUTES)))
+
+    step_texts = [p.text_content() for p in root.xpath(f'//*[@id="{STEPS_ID}"]/li/p')]
+    return title, raw_ingredients, step_texts
+
+def extract_with_soup(html: bytes, encoding: str) -> Tuple[Optional[str], List[RawIngredient], List[str]]:
+    soup = BeautifulSoup(html, "html.parser", from_encoding=encoding)
+    title_tag = soup.find("title")
+    title = title_tag.get_text() if title_tag is not None else None
+    raw_ingredients = [raw_ingredient_from_tag(p) for p in soup.select(f"#{INGREDIENTS_ID} > ul > li > p")]
+    step_texts = [p.text for p in soup.select(f"#{STEPS_ID} > li > p")]
+    return title, raw_ingredients, step_texts
+
+def extract_from_jsonld(html: bytes, encoding: str = "utf-8") -> Optional[RecipeParts]:
+    """Returns the recipe parts from the first json-ld Recipe object of the page, or None if there is no usable one."""
+    for match in JSONLD_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1).decode(encoding, errors="replace"))
+        except ValueError:
+            continue
+        recipe = find_jsonld_recipe(data)
+        if recipe is None:
+            continue
+        raw_ingredients = [raw_ingredient_from_text(clean_text(line)) for line in as_list(recipe.get("recipeIngredient"))
+                           if isinstance(line, str) and clean_text(line)]
+        step_texts = [text for text in instruction_texts(recipe.get("recipeInstructions")) if text]
+        if not raw_ingredients or not step_texts:
+            continue
+        title_match = TITLE_RE.search(html)
+        if title_match:
+            title = html_lib.unescape(title_match.group(1).decode(encoding, errors="replace")).strip()
+        else:
+            title = clean_text(str(recipe.get("name", "")))
+        return title, raw_ingredients, step_texts
+    return None
+
+def find_jsonld_recipe(data: Any) -> Optional[dict]:
+    """Returns the first object whose @type is (or contains) Recipe, searching lists and @graph."""
+    if isinstance(data, list):
+        for item in data:
+            recipe = find_jsonld_recipe(item)
+            if recipe is not None:
+                return recipe
+    elif isinstance(data, dict):
+        types = as_list(data.get("@type"))
+        if "Recipe" in types:
+            return data
+        if "@graph" in data:
+            return find_jsonld_recipe(data["@graph"])
+    return None
+
+def instruction_texts(instructions: Any) -> List[str]:
+    """Flattens recipeInstructions (a text, HowToStep objects or HowToSection objects) into step texts."""
+    texts = []
+    for instruction in as_list(instructions):
+        if isinstance(instruction, str):
+            texts.append(clean_text(instruction))
+        elif isinstance(instruction, dict):
+            if "itemListElement" in instruction:
+                texts.extend(instruction_texts(instruction["itemListElement"]))
+            elif "text" in instruction:
+                texts.append(clean_text(str(instruction["text"])))
+    return texts
+
+def as_list(value: Any) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def clean_text(text: str) -> str:
+    """Removes html tags and entities, and collapses whitespace."""
+    return " ".join(html_lib.unescape(TAG_RE.sub(" ", text)).split())
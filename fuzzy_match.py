@@ -0,0 +1,60 @@
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from fuzzywuzzy import fuzz, utils
+
+try:
+    from rapidfuzz import fuzz as rapid_fuzz, process as rapid_process
+except ImportError:   # optional dependency, every pair is scored with fuzzywuzzy instead
+    rapid_process = None
+
+# rapidfuzz's WRatio is an upper bound of fuzzywuzzy's up to rounding (fuzzywuzzy rounds every partial score and
+# its partial_ratio alignment is not optimal), so pairs more than this below the cutoff can't reach it
+PRUNE_SLACK = 2.0
+
+def full_process(text: str) -> str:
+    """The processing fuzzywuzzy's extractOne applies to the query and the choices before WRatio."""
+    return utils.full_process(text, force_ascii=True)
+
+@lru_cache(maxsize=256)
+def process_choices(choices: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(full_process(choice) for choice in choices)
+
+def exact_best(processed_query: str, processed_choices: Sequence[str], columns: Sequence[int]) -> Tuple[int, int]:
+    """Returns the (column, score) of the first best WRatio among the columns, like extractOne."""
+    best_column, best_score = -1, -1
+    for column in columns:
+        score = fuzz.WRatio(processed_query, processed_choices[column], full_process=False)
+        if score > best_score:
+            best_column, best_score = column, score
+    return best_column, best_score
+
+def extract_one_batch(queries: List[str], choices: List[str], score_cutoff: int = 80) -> List[Optional[Tuple[str, int]]]:
+    """
+    For every query, returns the (choice, score) that process.extractOne(query, choices) would return, or None if
+    its score is below score_cutoff.
+
+    With rapidfuzz, all the queries are scored against all the choices in one matrix (cdist) with a score cutoff,
+    and only the few pairs above it are scored again with fuzzywuzzy, so results are the same as extractOne.
+    """
+    if not queries or not choices:
+        return [None] * len(queries)
+    processed_choices = process_choices(tuple(choices))
+    processed_queries = [full_process(query) for query in queries]
+    unique_queries = list(dict.fromkeys(query for query in processed_queries if query))
+    if not unique_queries:
+        return [None] * len(queries)
+
+    if rapid_process is not None:
+        matrix = rapid_process.cdist(unique_queries, processed_choices, scorer=rapid_fuzz.WRatio, processor=None,
+                                     score_cutoff=max(score_cutoff - PRUNE_SLACK, 0))
+        candidates = [row.nonzero()[0].tolist() for row in matrix]
+    else:
+        candidates = [range(len(choices))] * len(unique_queries)
+
+    best = {}
+    for query, columns in zip(unique_queries, candidates):
+        column, score = exact_best(query, processed_choices, columns)
+        if column != -1 and score >= score_cutoff:
+            best[query] = (choices[column], score)
+    return [best.get(query) for query in processed_queries]
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from ToActionFuctions import answerVague
 from step import IngredientsType, ToolsType
@@ -95,8 +95,10 @@ def handle_fuzzy_what_questions(ingredients_names: IngredientsType, tools: Tools
             print(f"{tool}: {build_url_from_question(f'what is {tool}', use_google=True)}")
 
 
-def handle_fuzzy_how_questions(sentence: str) -> None:
-    actions_list = answerVague(sentence)
+def handle_fuzzy_how_questions(sentence: str, actions_list: Optional[List[str]] = None) -> None:
+    # actions_list: the vague actions of the sentence if already found (step.Action.vague_actions)
+    if actions_list is None:
+        actions_list = answerVague(sentence)
     
     if len(actions_list) > 0:
         print()
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_HTTP_CACHE_DIR = os.environ.get("RECIPE_HTTP_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache"))
+DEFAULT_TIMEOUT = 15.0
+
+class CachedResponse:
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Mapping[str, str], from_cache: bool) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers   # case-insensitive, like requests.Response.headers
+        self.from_cache = from_cache   # True if the body was not downloaded again (304, offline or network error)
+
+class HttpCache:
+    """
+    Local cache of http response bodies that revalidates them with conditional requests.
+
+    Every successful response is stored with its ETag and Last-Modified headers. The next request for the
+    same url sends If-None-Match / If-Modified-Since, and a 304 answer is served from disk.
+    - offline=True: cached bodies are served without touching the network (error if the url was never fetched)
+    - if the network is down, the cached body is served instead of raising
+    """
+    def __init__(self, cache_dir: str = DEFAULT_HTTP_CACHE_DIR, offline: bool = False, timeout: float = DEFAULT_TIMEOUT) -> None:
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.timeout = timeout
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def paths(self, url: str) -> Tuple[str, str]:
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json"), os.path.join(self.cache_dir, f"{name}.body")
+
+    def load(self, url: str) -> Optional[Dict]:
+        meta_path, body_path = self.paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                meta["content"] = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("url") == url else None
+
+    def store(self, url: str, response: requests.Response) -> None:
+        meta_path, body_path = self.paths(url)
+        meta = {
+            "url": url,
+            "status_code": response.status_code,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type"),
+            "fetched": time.time(),
+        }
+        # body first: a meta file always points to a complete body
+        self.atomic_write(body_path, response.content)
+        self.atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def atomic_write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def from_meta(self, meta: Dict) -> CachedResponse:
+        headers = CaseInsensitiveDict({"Content-Type": meta["content_type"]} if meta.get("content_type") else {})
+        return CachedResponse(meta["url"], meta["status_code"], meta["content"], headers, from_cache=True)
+
+    def get(self, url: str, session: Optional[requests.Session] = None, timeout: Optional[float] = None) -> CachedResponse:
+        """Returns the response of the url, revalidating the cached body if there is one."""
+        meta = self.load(url)
+        if self.offline:
+            if meta is None:
+                raise Exception(f"Offline mode: {url} is not in the http cache")
+            return self.from_meta(meta)
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            get = session.get if session is not None else requests.get
+            response = get(url, headers=headers, timeout=timeout if timeout is not None else self.timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if meta is None:
+                raise
+            return self.from_meta(meta)
+
+        if response.status_code == 304 and meta is not None:
+            return self.from_meta(meta)
+        if response.status_code == 200:
+            self.store(url, response)
+        return CachedResponse(url, response.status_code, response.content, response.headers, from_cache=False)
+
+_default_cache: Optional[HttpCache] = None
+
+def get_http_cache() -> HttpCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HttpCache(offline=os.environ.get("RECIPE_OFFLINE", "") == "1")
+    return _default_cache
@@ -0,0 +1,130 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+from model_registry import get_model, SMALL_MODEL, LARGE_MODEL
+from sentence_analysis import DEFAULT_BATCH_SIZE
+from web import get_recipe_parts_from_url
+from recipe import Recipe
+
+DEFAULT_CHUNK_SIZE = 4
+DEFAULT_FSYNC_EVERY = 100
+
+_batch_size = DEFAULT_BATCH_SIZE
+
+def read_sources(path: str) -> List[str]:
+    """Returns the urls or snapshot paths of the input file, one per line (blank lines and # comments are skipped)."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+def is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+def load_checkpoint(output_path: str, retry_errors: bool = False) -> Set[str]:
+    """
+    Returns the sources already written to the output file, which is the checkpoint of the job.
+
+    A last line cut off by a killed job is truncated so that the output stays valid json lines. Sources that
+    failed count as done unless retry_errors.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    valid_bytes = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            valid_bytes += len(line)
+            if "error" not in record or not retry_errors:
+                done.add(record["source"])
+    if valid_bytes < os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return done
+
+def init_worker(batch_size: int) -> None:
+    """Loads the models once in each worker process, before its first recipe."""
+    global _batch_size
+    _batch_size = batch_size
+    get_model(SMALL_MODEL)
+    get_model(LARGE_MODEL)
+
+def parse_source(task: Tuple[int, str]) -> Dict:
+    """Parses one url or saved page and returns its output record."""
+    index, source = task
+    start = time.perf_counter()
+    try:
+        if is_url(source):
+            recipe_name, raw_ingredients, step_texts = get_recipe_parts_from_url(source)
+            recipe = Recipe.from_raw(recipe_name, raw_ingredients, step_texts, _batch_size)
+        else:
+            recipe = Recipe.from_html(source, batch_size=_batch_size)
+        # the whole recipe is written: its lazy fields are computed with batched parses
+        record = {"index": index, "source": source, "recipe": recipe.materialize().to_dict()}
+    except Exception as e:
+        record = {"index": index, "source": source, "error": f"{type(e).__name__}: {e}"}
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+def ingest(input_path: str, output_path: str, workers: int = 0, batch_size: int = DEFAULT_BATCH_SIZE,
+           chunk_size: int = DEFAULT_CHUNK_SIZE, retry_errors: bool = False, fsync_every: int = DEFAULT_FSYNC_EVERY) -> Dict[str, int]:
+    """
+    Parses every source of the input file on a pool of worker processes and appends one json line per recipe
+    to the output file, in completion order (the "index" field is the position in the input file).
+
+    Running it again with the same output file resumes the job: sources already in the output are skipped.
+    With retry_errors, failed sources are parsed again and the latest line of a source is the one to use.
+    """
+    workers = workers or os.cpu_count() or 1
+    sources = read_sources(input_path)
+    done = load_checkpoint(output_path, retry_errors)
+    tasks = []
+    for index, source in enumerate(sources):
+        # the same source listed twice is only parsed once
+        if source not in done:
+            done.add(source)
+            tasks.append((index, source))
+    counts = {"total": len(sources), "skipped": len(sources) - len(tasks), "parsed": 0, "failed": 0}
+    if not tasks:
+        return counts
+
+    start = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as output, \
+         multiprocessing.Pool(workers, initializer=init_worker, initargs=(batch_size,)) as pool:
+        for n, record in enumerate(pool.imap_unordered(parse_source, tasks, chunksize=chunk_size), 1):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            if n % fsync_every == 0:
+                os.fsync(output.fileno())
+            counts["failed" if "error" in record else "parsed"] += 1
+            if n % 100 == 0 or n == len(tasks):
+                elapsed = time.perf_counter() - start
+                print(f"{n}/{len(tasks)} recipes, {n / elapsed:.1f} recipes/s, {counts['failed']} failed", file=sys.stderr)
+        os.fsync(output.fileno())
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse a file of recipe urls or saved page paths into json lines, on several processes.")
+    parser.add_argument("input", help="file with one url or saved page path (.html, .html.gz, .html.zst) per line")
+    parser.add_argument("output", help="json lines output, also used as the checkpoint to resume a stopped job")
+    parser.add_argument("--workers", type=int, default=0, help="number of worker processes (default: number of cores)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="nlp.pipe batch size inside a recipe")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="recipes sent to a worker at once")
+    parser.add_argument("--retry-errors", action="store_true", help="parse the sources that failed in a previous run again")
+    args = parser.parse_args()
+
+    counts = ingest(args.input, args.output, args.workers, args.batch_size, args.chunk_size, args.retry_errors)
+    print(f"{counts['parsed']} parsed, {counts['failed']} failed, {counts['skipped']} already done, {counts['total']} in input", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
+import re
+import sys
 from bs4 import BeautifulSoup
 from bs4.element import Tag
-from typing import List, Tuple
+from typing import List, Tuple, Union, Optional
 from unicodedata import numeric
 from fractions import Fraction
 from fuzzywuzzy import fuzz
@@ -11,12 +13,70 @@ def quantity_to_str(quantity: float) -> str:
     else:
         return str(quantity)
 
+class RawIngredient:
+    """Text of an ingredient line and of its quantity, unit and name spans (None if the span is missing)."""
+    def __init__(self, text: str, quantity: Optional[str], unit: Optional[str], name: Optional[str]) -> None:
+        self.text = text
+        self.quantity = quantity
+        self.unit = unit
+        self.name = name
+
+def raw_ingredient_from_tag(ingredient: Tag) -> RawIngredient:
+    """Collects the text of the quantity, unit and name spans of an ingredient <p> tag."""
+    spans = {}
+    for span in ingredient.find_all("span"):
+        for attribute in ("data-ingredient-quantity", "data-ingredient-unit", "data-ingredient-name"):
+            if span.get(attribute) == "true" and attribute not in spans:
+                spans[attribute] = span.text
+    return RawIngredient(ingredient.text, spans.get("data-ingredient-quantity"), spans.get("data-ingredient-unit"),
+                         spans.get("data-ingredient-name"))
+
+# units recognized in plain ingredient lines (schema.org recipeIngredient has no quantity / unit / name spans)
+UNITS = {
+    "cup", "cups", "c", "tablespoon", "tablespoons", "tbsp", "teaspoon", "teaspoons", "tsp",
+    "pound", "pounds", "lb", "lbs", "ounce", "ounces", "oz", "fluid", "pint", "pints", "quart", "quarts",
+    "gallon", "gallons", "liter", "liters", "milliliter", "milliliters", "ml", "gram", "grams", "g",
+    "kilogram", "kilograms", "kg", "can", "cans", "package", "packages", "jar", "jars", "bottle", "bottles",
+    "clove", "cloves", "pinch", "pinches", "dash", "dashes", "slice", "slices", "stick", "sticks",
+    "head", "heads", "bunch", "bunches", "sprig", "sprigs", "envelope", "envelopes", "container", "containers",
+}
+QUANTITY_PART_RE = re.compile(r"^(\d+(\.\d+)?|\d+/\d+|[\u00bc-\u00be\u2150-\u215e])$")
+
+def raw_ingredient_from_text(text: str) -> RawIngredient:
+    """
+    Splits a plain ingredient line into quantity, unit and name, like the spans of the allrecipes markup.
+    
+    Example: "1 (15 ounce) can kidney beans, drained" -> "1 (15 ounce)", "can", "kidney beans, drained"
+    """
+    words = text.split()
+    i = 0
+    while i < len(words) and QUANTITY_PART_RE.match(words[i]):
+        i += 1
+    # package size right after the quantity, e.g. "(15 ounce)"
+    if 0 < i < len(words) and words[i].startswith("("):
+        while i < len(words) and not words[i].endswith(")"):
+            i += 1
+        i += 1
+    quantity = " ".join(words[:i]) if i > 0 else None
+    unit = None
+    if i < len(words) and words[i].lower().rstrip(".") in UNITS:
+        unit = words[i]
+        i += 1
+    name = " ".join(words[i:]) if i < len(words) else text.strip()
+    return RawIngredient(text, quantity, unit, name)
+
 class Ingredient:
-    def __init__(self, ingredient: Tag) -> None:
+    # no per-instance dict: many parsed recipes are kept in memory
+    __slots__ = ("string", "quantity", "remaining_quantity", "unit", "name", "preparation")
+    
+    def __init__(self, ingredient: Union[Tag, RawIngredient]) -> None:
+        if not isinstance(ingredient, RawIngredient):
+            ingredient = raw_ingredient_from_tag(ingredient)
         self.string = ingredient.text
         self.quantity, remaining_str = self.extract_quantity(ingredient)
         self.remaining_quantity=self.quantity
-        self.unit = self.extract_unit(ingredient, remaining_str)
+        # units are few and shared by every recipe
+        self.unit = sys.intern(self.extract_unit(ingredient, remaining_str))
         self.name, self.preparation = self.extract_name_preparation(ingredient)
     
     def is_same_ingredient(self, other_ingredient: str) -> bool:
@@ -35,7 +95,7 @@ class Ingredient:
 
     def update_unit(self,new_unit: str) -> None:
         self.string = self.string.replace(self.unit, new_unit)
-        self.unit=new_unit
+        self.unit=sys.intern(new_unit)
 
     def update_name(self,new_name: str) -> None:
         self.string = self.string.replace(self.name, new_name)
@@ -45,12 +105,11 @@ class Ingredient:
         self.string = self.string.replace(self.preparation, new_preparation)
         self.preparation=new_preparation       
         
-    def extract_quantity(self, ingredient: Tag) -> Tuple[float, str]:
-        quantity_tag = ingredient.find("span", {"data-ingredient-quantity": "true"})
-        if quantity_tag is None:
+    def extract_quantity(self, ingredient: RawIngredient) -> Tuple[float, str]:
+        if ingredient.quantity is None:
             return 0.0, ""
         
-        quantity_text = quantity_tag.text
+        quantity_text = ingredient.quantity
         quantity = 0.0
         
         for quantity_part in quantity_text.split():
@@ -79,18 +138,19 @@ class Ingredient:
             self.string = self.string.replace(quantity_text, quantity_to_str(quantity))
         return quantity, ""
     
-    def extract_unit(self, ingredient: Tag, remaining_str: str) -> str:
-        unit_tag = ingredient.find("span", {"data-ingredient-unit": "true"})
-        if unit_tag is None:
+    def extract_unit(self, ingredient: RawIngredient, remaining_str: str) -> str:
+        if ingredient.unit is None:
             return remaining_str
         else:
             if remaining_str:
-                return remaining_str + " " + unit_tag.text
+                return remaining_str + " " + ingredient.unit
             else:
-                return unit_tag.text
+                return ingredient.unit
     
-    def extract_name_preparation(self, ingredient: Tag) -> Tuple[str, str]:
-        name_text = ingredient.find("span", {"data-ingredient-name": "true"}).text
+    def extract_name_preparation(self, ingredient: RawIngredient) -> Tuple[str, str]:
+        if ingredient.name is None:
+            raise Exception(f"No ingredient name found in '{ingredient.text.strip()}'.")
+        name_text = ingredient.name
         if ", " in name_text:
             return tuple(name_text.split(", ", 1))
         else:
@@ -103,7 +163,7 @@ class Ingredient:
         return self.string + " " + f"(quantity: {self.remaining_quantity}, unit: {self.unit}, name: {self.name}, preparation: {self.preparation if self.preparation else 'no preparation'})"
 
 
-def parse_ingredients(raw_ingredients: List[Tag]) -> List[Ingredient]:
+def parse_ingredients(raw_ingredients: List[Union[Tag, RawIngredient]]) -> List[Ingredient]:
     ingredients = []
     
     for ingredient in raw_ingredients:
@@ -0,0 +1,123 @@
+from itertools import product
+from typing import Dict, List, Optional, Set, Tuple
+
+from spacy.tokens import Doc, Token
+
+from model_registry import pipe_pipeline, SMALL_MODEL
+
+# pipeline profile used on the ingredient names (lemmas)
+NAME_PROFILE = "tagger"
+
+# (start token index, end token index (exclusive), ingredient name)
+Mention = Tuple[int, int, str]
+
+def singular(word: str) -> str:
+    """Crude singular form, applied the same way to ingredient words and sentence words so "egg" == "eggs"."""
+    if len(word) > 3 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith(("ches", "shes", "sses", "xes", "zes", "oes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+# punctuation left on the tokens of the hyphen tokenizer, which has no prefix / suffix rules ("flour,")
+STRIP_CHARACTERS = ".,;:!?()[]\"'"
+
+def word_key(word: str) -> str:
+    return singular(word.lower().strip(STRIP_CHARACTERS))
+
+def token_keys(token: Token) -> Set[str]:
+    """Forms of a token a variant can match: its lowercased text and, if tagged, its lemma (singular forms)."""
+    keys = {word_key(token.text)}
+    if token.lemma_:
+        keys.add(word_key(token.lemma_))
+    return keys
+
+class IngredientMatcher:
+    """
+    Finds the mentions of a recipe's ingredients in a sentence, compiled once from its ingredient names.
+
+    Each name is turned into phrase variants (each word as written, as its lemma, singular or plural) stored in a
+    token trie, so a sentence is scanned in one pass taking the longest ingredient phrase at each token.
+    Names that are not mentioned as a whole can still be found from one of their words with word_mentions.
+    """
+    def __init__(self, ingredient_names: List[str]) -> None:
+        self.ingredient_names = list(ingredient_names)
+        self.trie: Dict = {}
+        self.word_index: Dict[str, List[str]] = {}
+        names = [name for name in dict.fromkeys(self.ingredient_names) if name.strip()]
+        for name, doc in zip(names, pipe_pipeline(SMALL_MODEL, [name.lower() for name in names], NAME_PROFILE)):
+            words = [token for token in doc if word_key(token.text)]
+            if not words:
+                continue
+            for variant in product(*[sorted(token_keys(token)) for token in words]):
+                self.add_variant(variant, name)
+            for word in name.lower().split():
+                self.word_index.setdefault(word, []).append(name)
+
+    def add_variant(self, variant: Tuple[str, ...], name: str) -> None:
+        node = self.trie
+        for key in variant:
+            node = node.setdefault(key, {})
+        # the first ingredient with this variant wins
+        node.setdefault(None, name)
+
+    def find_mentions(self, doc: Doc) -> List[Mention]:
+        """Returns the non-overlapping ingredient phrases of the doc, longest match first, in one pass."""
+        mentions = []
+        start = 0
+        while start < len(doc):
+            nodes = [self.trie]
+            best = None
+            end = start
+            while end < len(doc) and nodes:
+                keys = token_keys(doc[end])
+                nodes = [node[key] for node in nodes for key in keys if key in node]
+                end += 1
+                for node in nodes:
+                    if None in node:
+                        best = (start, end, node[None])
+                        break
+            if best is None:
+                start += 1
+            else:
+                mentions.append(best)
+                start = best[1]
+        return mentions
+
+    def word_mentions(self, doc: Doc, names: List[str]) -> Dict[str, int]:
+        """
+        Returns the index of the first NOUN token that is one of the words of each name (like
+        spacy_helper.find_ingredient_index, but one pass for all the names).
+        """
+        wanted = set(names)
+        found = {}
+        for token in doc:
+            if token.pos_ != "NOUN":
+                continue
+            for name in self.word_index.get(token.text, []):
+                if name in wanted and name not in found:
+                    found[name] = token.i
+        return found
+
+    def ingredient_indices(self, doc: Doc, names: List[str]) -> Dict[str, int]:
+        """
+        Returns the token index of each of the names mentioned in the doc: the last token of its phrase, or the
+        first NOUN token that is one of its words if the whole phrase isn't there.
+        """
+        wanted = set(names)
+        indices = {}
+        for start, end, name in self.find_mentions(doc):
+            if name in wanted and name not in indices:
+                indices[name] = end - 1
+        missing = [name for name in names if name not in indices]
+        if missing:
+            for name, index in self.word_mentions(doc, missing).items():
+                indices[name] = index
+        # same order as the names
+        return {name: indices[name] for name in names if name in indices}
+
+def matcher_for(ingredient_names: List[str], matcher: Optional[IngredientMatcher] = None) -> IngredientMatcher:
+    """Returns the given matcher, or compiles one for the names."""
+    return matcher if matcher is not None else IngredientMatcher(ingredient_names)
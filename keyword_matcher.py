@@ -0,0 +1,75 @@
+import re
+from typing import Dict, List
+
+def trie_pattern(words: List[str]) -> str:
+    """
+    Returns a regex matching any of the words, built from their character trie (e.g. "pa(?:n|stry brush)")
+    so each position of the text is checked against all the words in one pass. Longer words are tried first.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def node_pattern(node: Dict) -> str:
+        branches = [re.escape(char) + node_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # the word ending here is only used if no longer word matches
+            pattern = "(?:" + pattern + ")?"
+        return pattern
+
+    return node_pattern(trie)
+
+def is_word_character(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+def inner_keywords(keyword: str, vocabulary: Dict[str, int]) -> List[str]:
+    """
+    Returns the other keywords of the vocabulary found in the keyword as whole words, optionally followed by
+    "ing" (like re.search(r"\bother(|ing)\b", keyword)). Only the substrings between two word boundaries are
+    looked up, so the cost depends on the number of words of the keyword, not on the size of the vocabulary.
+    """
+    boundaries = [i for i in range(len(keyword) + 1)
+                  if (i > 0 and is_word_character(keyword[i - 1])) != (i < len(keyword) and is_word_character(keyword[i]))]
+    found = set()
+    for n, start in enumerate(boundaries):
+        for end in boundaries[n + 1:]:
+            part = keyword[start:end]
+            for other in (part, part[:-3] if part.endswith("ing") else None):
+                if other and other != keyword and other in vocabulary:
+                    found.add(other)
+    return sorted(found, key=vocabulary.__getitem__)
+
+class KeywordMatcher:
+    """
+    Finds the keywords of a vocabulary that appear as whole words in a text, optionally followed by "ing"
+    (like re.search(r"\bkeyword(|ing)\b", text) for each keyword), with one compiled regex and a single scan of
+    the text.
+
+    - longest_match: a keyword inside a longer matched one is not reported ("pan" in "roasting pan")
+    - otherwise every keyword found in the text is reported, including the ones inside a longer keyword
+      ("stir" in "stir-fry")
+
+    Keywords are returned in vocabulary order, each once.
+    """
+    def __init__(self, keywords: List[str], longest_match: bool = True) -> None:
+        self.keywords = list(dict.fromkeys(keywords))
+        self.order = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self.longest_match = longest_match
+        self.regex = re.compile(r"\b(" + trie_pattern(self.keywords) + r")(?:ing)?\b")
+        # keywords found as whole words inside another keyword
+        self.inner: Dict[str, List[str]] = {keyword: inner_keywords(keyword, self.order) for keyword in self.keywords}
+
+    def find(self, text: str) -> List[str]:
+        found = set()
+        for match in self.regex.finditer(text):
+            keyword = match.group(1)
+            found.add(keyword)
+            if not self.longest_match:
+                found.update(self.inner[keyword])
+        return sorted(found, key=self.order.__getitem__)
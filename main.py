@@ -1,3 +1,4 @@
+import argparse
 from enum import Enum
 from typing import Callable
 from copy import deepcopy
@@ -5,9 +6,10 @@ from fractions import Fraction
 import logging
 logging.getLogger().setLevel(logging.ERROR)
 
-from recipe import Recipe
-from quantity_transformation import transform_quantity
-from transformation import transform_recipe_type
+from recipe_cache import load_recipe
+from model_registry import model_report
+from transformation_plan import TransformationPlan
+from transformation_cache import TransformationCache, DEFAULT_MAX_BYTES
 from handle_questions import is_vague_question, is_specific_question, handle_specific_question, handle_fuzzy_what_questions, handle_fuzzy_how_questions
 
 class State(Enum):
@@ -20,12 +22,15 @@ class State(Enum):
     FINISH = 5
     
 class RecipeStateMachine:
-    def __init__(self) -> None:
+    def __init__(self, transform_cache_bytes: int = DEFAULT_MAX_BYTES) -> None:
         self.state = State.INPUT_URL
         # two recipe objects, first used for revert back to original recipe, second used for current recipe
         # both initialized in input_url
         self.original_recipe = None
         self.recipe = None
+        # transformed versions of the original recipe already computed, bounded by transform_cache_bytes
+        self.transform_cache_bytes = transform_cache_bytes
+        self.transformed_recipes = None
         self.current_transformations = self.get_original_transformations()
         self.current_action = 0
         
@@ -72,8 +77,11 @@ class RecipeStateMachine:
             try:
                 print()
                 print(f"Fetching recipe from {url}...")
-                self.recipe = Recipe(url)
-                self.original_recipe = deepcopy(self.recipe)
+                # the spacy models are only loaded if the recipe isn't cached
+                self.recipe = load_recipe(url, preload=True)
+                # transformed versions are new snapshots sharing what didn't change (Recipe.transformed)
+                self.original_recipe = self.recipe
+                self.transformed_recipes = TransformationCache(self.original_recipe, self.transform_cache_bytes)
                 self.state = State.ABSTRACT
                 return
             except Exception as e:
@@ -327,40 +335,21 @@ class RecipeStateMachine:
         print(f"Current recipe: {self.current_transformations}")
         print(f"New recipe:     {new_transformations}")
 
-        cur_vegan = self.current_transformations['vegan']
-        cur_healthy = self.current_transformations['healthy']
-        new_vegan = new_transformations['vegan']
-        new_healthy = new_transformations['healthy']
-        cur_vegetarian = self.current_transformations['vegetarian']
-        cur_italian = self.current_transformations['italian']
-        new_vegetarian = new_transformations['vegetarian']
-        new_italian = new_transformations['italian']
-
-        if (cur_vegan and not new_vegan) or (cur_healthy and not new_healthy) or (cur_italian and not new_italian) or (cur_vegetarian and not new_vegetarian):
-            print("Reverting back to the original recipe...")
-            self.recipe = deepcopy(self.original_recipe)
-            self.current_transformations = self.get_original_transformations()
-        # transform the recipe by combining the current transformations and the new transformations
-        if new_vegan:
-            print("Transforming to vegan...")
-            new_sentences_list_type, new_ingredients_type = transform_recipe_type(self.recipe, 'vegan')
-            self.recipe.transform(new_sentences_list_type, new_ingredients_type, modification=self.get_modification_str(new_transformations))
-        if new_vegetarian:
-            print("Transforming to vegetarian...")
-            new_sentences_list_type, new_ingredients_type = transform_recipe_type(self.recipe, 'vegetarian')
-            self.recipe.transform(new_sentences_list_type, new_ingredients_type, modification=self.get_modification_str(new_transformations))
-        if new_italian:
-                    print("Transforming to italian...")
-                    new_sentences_list_type, new_ingredients_type = transform_recipe_type(self.recipe, 'italian')
-                    self.recipe.transform(new_sentences_list_type, new_ingredients_type, modification=self.get_modification_str(new_transformations))
-        if new_healthy:
-            print("Transforming to healthy...")
-            new_sentences_list_type, new_ingredients_type = transform_recipe_type(self.recipe, 'healthy')
-            self.recipe.transform(new_sentences_list_type, new_ingredients_type, modification=self.get_modification_str(new_transformations))
-        if new_transformations['quantity'] != self.current_transformations['quantity']:
-            print(f"Scaling quantity by {new_transformations['quantity']}...")
-            new_sentences_list, new_ingredients = transform_quantity(self.recipe, new_transformations['quantity'] / self.current_transformations['quantity'])
-            self.recipe.transform(new_sentences_list, new_ingredients, modification=self.get_modification_str(new_transformations))
+        # combinations already computed are reused as they are
+        recipe = self.transformed_recipes.get(new_transformations)
+        if recipe is not None:
+            print("Using the recipe already transformed this way...")
+            self.recipe = recipe
+            self.current_transformations = new_transformations
+            return
+        # every transformation is planned on the original recipe and the recipe is parsed again only once
+        plan = TransformationPlan.from_transformations(new_transformations)
+        if plan.types:
+            print(f"Transforming to {', '.join(plan.types)}...")
+        if plan.quantity != 1.0:
+            print(f"Scaling quantity by {plan.quantity}...")
+        self.recipe = plan.transformed(self.original_recipe, modification=self.get_modification_str(new_transformations))
+        self.transformed_recipes.put(new_transformations, self.recipe)
         self.current_transformations = new_transformations
         
     def abstract(self) -> None:
@@ -572,7 +561,7 @@ class RecipeStateMachine:
             elif is_vague_question(user_input):
                 cur_action = self.recipe.get_action(self.current_action)
                 if "how" in user_input:
-                    handle_fuzzy_how_questions(cur_action.sentence)
+                    handle_fuzzy_how_questions(cur_action.sentence, cur_action.vague_actions)
                 else:
                     handle_fuzzy_what_questions(cur_action.ingredients, cur_action.tools)
             else:
@@ -637,10 +626,16 @@ class RecipeStateMachine:
         self.state = State.INPUT_URL
         self.original_recipe = None
         self.recipe = None
+        self.transformed_recipes = None
         self.current_transformations = {'quantity': 1,'vegan': False, 'healthy': False, 'vegetarian':False, 'italian':False}
         self.current_action = 0
     
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse, transform and navigate an allrecipes recipe.")
+    parser.add_argument("--model-report", action="store_true", help="print the load time and memory of the spacy models on exit")
+    args = parser.parse_args()
     state_machine = RecipeStateMachine()
-    state_machine.run()
\ No newline at end of file
+    state_machine.run()
+    if args.model_report:
+        print(model_report())
\ No newline at end of file
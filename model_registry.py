@@ -0,0 +1,135 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Union
+
+import spacy
+from spacy.language import Language
+from spacy.tokenizer import Tokenizer
+from spacy.tokens import Doc
+
+logger = logging.getLogger(__name__)
+
+SMALL_MODEL = "en_core_web_sm"
+LARGE_MODEL = "en_core_web_lg"
+
+# pipeline components run by each profile, from the cheapest to the most complete (None: every component)
+# - tokens-only: tokenizer and lexical attributes (text, is_stop, like_num, ...)
+# - tagger: + pos_, tag_ and lemma_
+# - parser: + dep_, head and noun_chunks
+PROFILES: Dict[str, Union[List[str], None]] = {
+    "tokens-only": [],
+    "tagger": ["tok2vec", "tagger", "attribute_ruler", "lemmatizer"],
+    "parser": ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer"],
+    "full": None,
+}
+PROFILE_ORDER = list(PROFILES)
+
+# every spacy pipeline is loaded at most once per process and shared by all callers
+_models: Dict[str, Language] = {}
+_model_stats: Dict[str, Dict[str, Union[float, int]]] = {}
+_hyphen_tokenizers: Dict[str, Tokenizer] = {}
+_lock = threading.RLock()
+
+def current_rss() -> int:
+    """Returns the resident memory of this process in bytes (0 if it can't be measured)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # peak rss, in bytes on macos and kilobytes elsewhere
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+    except (ImportError, AttributeError):
+        return 0
+
+def get_model(name: str) -> Language:
+    """Returns the spacy pipeline with the given name, loading it on first use."""
+    if name in _models:
+        return _models[name]
+    with _lock:
+        if name in _models:
+            return _models[name]
+        rss_before = current_rss()
+        start = time.perf_counter()
+        _models[name] = spacy.load(name)
+        load_seconds = time.perf_counter() - start
+        _model_stats[name] = {
+            "load_seconds": load_seconds,
+            "rss_bytes": max(current_rss() - rss_before, 0),
+        }
+        logger.info(f"Loaded {name} in {load_seconds:.2f}s ({_model_stats[name]['rss_bytes'] / 2**20:.1f} MB)")
+        return _models[name]
+
+def get_hyphen_tokenizer(name: str = SMALL_MODEL) -> Tokenizer:
+    """
+    Returns a tokenizer sharing the vocab of the given model with the model's infix rules plus a split on "-" after
+    a number ("2-inch" -> "2", "-", "inch"), and no prefix or suffix rules.
+
+    The tokenizer only fills lexical attributes (text, is_stop, ...), the model's pipeline is not run.
+    """
+    with _lock:
+        if name not in _hyphen_tokenizers:
+            nlp = get_model(name)
+            infix_re = spacy.util.compile_infix_regex(nlp.Defaults.infixes + [r'(?<=[0-9])-'])
+            _hyphen_tokenizers[name] = Tokenizer(nlp.vocab, infix_finditer=infix_re.finditer)
+        return _hyphen_tokenizers[name]
+
+def profile_covers(profile: str, required_profile: str) -> bool:
+    """Returns True if a doc processed with profile has every annotation of required_profile."""
+    return PROFILE_ORDER.index(profile) >= PROFILE_ORDER.index(required_profile)
+
+def disabled_components(nlp: Language, profile: str) -> List[str]:
+    """Returns the names of the components of nlp that the profile doesn't need."""
+    enabled = PROFILES[profile]
+    if enabled is None:
+        return []
+    return [name for name in nlp.pipe_names if name not in enabled]
+
+def run_pipeline(name: str, text: str, profile: str = "full") -> Doc:
+    """Runs the text through the components of the model needed by the profile."""
+    nlp = get_model(name)
+    if profile == "tokens-only":
+        return nlp.make_doc(text)
+    return nlp(text, disable=disabled_components(nlp, profile))
+
+def pipe_pipeline(name: str, texts: List[str], profile: str = "full", batch_size: int = 64) -> Iterator[Doc]:
+    """Like run_pipeline, but processes the texts in batches with nlp.pipe."""
+    nlp = get_model(name)
+    if profile == "tokens-only":
+        return nlp.tokenizer.pipe(texts, batch_size=batch_size)
+    return nlp.pipe(texts, batch_size=batch_size, disable=disabled_components(nlp, profile))
+
+def preload_models(names: Iterable[str] = (SMALL_MODEL, LARGE_MODEL)) -> threading.Thread:
+    """Loads the given models in a background thread (e.g. while waiting for user input) and returns the thread."""
+    def load_all() -> None:
+        for name in names:
+            try:
+                get_model(name)
+            except Exception as e:
+                # the error is raised again on the first real use of the model
+                logger.error(f"Failed to preload {name}: {e}")
+    thread = threading.Thread(target=load_all, daemon=True)
+    thread.start()
+    return thread
+
+def is_loaded(name: str) -> bool:
+    return name in _models
+
+def get_model_stats() -> Dict[str, Dict[str, Union[float, int]]]:
+    """Returns a dictionary of (model name, {"load_seconds", "rss_bytes"}) pairs for every loaded model."""
+    return {name: dict(stats) for name, stats in _model_stats.items()}
+
+def model_report() -> str:
+    """Returns a human readable summary of the loaded models."""
+    if not _model_stats:
+        return "No spacy model loaded."
+    lines = []
+    for name, stats in _model_stats.items():
+        lines.append(f"{name}: loaded in {stats['load_seconds']:.2f}s, about {stats['rss_bytes'] / 2**20:.1f} MB")
+    return "\n".join(lines)
@@ -2,20 +2,22 @@ from typing import List, Tuple
 from unicodedata import numeric
 from fractions import Fraction
 from word2num import Word2Num
-from copy import deepcopy
-import spacy
+from copy import copy
 w2n = Word2Num(fuzzy_threshold=60)
-spacy_model = spacy.load("en_core_web_lg")
 
 from ingredient import Ingredient
 from step import Action, Step
-from sentence_helper import imperative_to_normal
+from sentence_analysis import analyze
+
+# pipeline profile (see model_registry.PROFILES) needed by modify_quantity_action: POS of the tokens
+QUANTITY_PROFILE = "tagger"
 
 # option 2: def transform_quantity(sentences_list: List[List[str]], ingredients_list: List[Ingredient], quantity_update_ratio: float) -> Tuple[List[List[str]], List[Ingredient]]:
 def transform_quantity(recipe, quantity_update_ratio: float) -> Tuple[List[List[str]], List[Ingredient]]:
     """Modify the quantity of ingredients in the sentences_list and ingredients_list by a ratio."""
-    sentences_list = deepcopy(recipe.sentences_list)  # List[List[str]]
-    ingredients_list = deepcopy(recipe.ingredients)  # List[Ingredient]
+    # new lists sharing the (unchanged) sentences and ingredients: the ingredients are copied only when scaled
+    sentences_list = [list(sentences) for sentences in recipe.sentences_list]  # List[List[str]]
+    ingredients_list = list(recipe.ingredients)  # List[Ingredient]
     
     if quantity_update_ratio == 1.0:
         return sentences_list, ingredients_list
@@ -42,13 +44,14 @@ def modify_quantity_action(action: Action, quantity_update_ratio: float) -> str:
     if "each" in action.sentence:
         return action.sentence
     
-    doc = spacy_model(imperative_to_normal(action.sentence))
     new_sentence = action.sentence
+    # read first: the ingredients info needs a parser doc, which the tagger profile below then reuses
     ingredients_info_list = list(action.ingredients_info.values()) # List of (info_str, num_index, i_index)
     
     if len(ingredients_info_list) == 0:
         return new_sentence
     
+    doc = analyze(action.sentence).normal_doc(QUANTITY_PROFILE)
     cur_info_idx = 0
     token_index = 0
     while token_index < len(doc) and cur_info_idx < len(ingredients_info_list):
@@ -83,8 +86,13 @@ def modify_quantity_ingredients(ingredients_list: List[Ingredient], quantity_upd
     """Modify the quantity of ingredients in the ingredients_list by a ratio."""
     new_ingredients_list = []
     for ingredient in ingredients_list:
-        new_ingredient = deepcopy(ingredient)
-        new_ingredient.update_remaining_quantity(ingredient.remaining_quantity * quantity_update_ratio)
+        new_quantity = ingredient.remaining_quantity * quantity_update_ratio
+        if new_quantity == ingredient.remaining_quantity:
+            # no quantity (0.0): shared with the original list
+            new_ingredients_list.append(ingredient)
+            continue
+        new_ingredient = copy(ingredient)
+        new_ingredient.update_remaining_quantity(new_quantity)
         new_ingredients_list.append(new_ingredient)
     return new_ingredients_list
 
@@ -1,7 +1,6 @@
 import spacy
 import re
-nlp = spacy.load('en_core_web_sm')
-spacy_model = spacy.load("en_core_web_lg")
+from .model_registry import get_model, SMALL_MODEL, LARGE_MODEL
 
 def findTool(ListSentence):
     # Yifan: 
@@ -86,7 +85,7 @@ def findMethodSingle(sentence):
 
 #find verb
 def findAllVerbSingle(sentence):
-    doc = nlp(sentence)
+    doc = get_model(SMALL_MODEL)(sentence)
     verbs = []
     for token in doc:
         if token.pos_ == "VERB" and not token.text.endswith("ed"):
@@ -97,7 +96,7 @@ def findAllVerbSingle(sentence):
 #find verb noun relation
 def findRelationVerbSingle(sentence):
     verblist = []
-    spacy_output = spacy_model(sentence)
+    spacy_output = get_model(LARGE_MODEL)(sentence)
     for n in spacy_output.noun_chunks:
         if n.text == "You":
             continue
@@ -5,6 +5,10 @@ from rasa_sdk.events import SlotSet
 from rasa_sdk.executor import CollectingDispatcher
 
 from .recipe_state import RecipeRasaStateMachine
+from .model_registry import preload_models
+
+# load the spacy models when the action server starts instead of on the first recipe url
+preload_models()
 
 #  - action_process_recipe_url
 class ActionProcessRecipeURL(Action):
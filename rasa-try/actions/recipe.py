@@ -1,4 +1,4 @@
-from typing import Dict, Tuple
+from typing import Dict, Tuple, List
 from bs4.element import Tag
 
 
@@ -10,9 +10,18 @@ from .step import parse_steps, parse_methods, parse_tools, Action
 
 class Recipe:
     def __init__(self, url: str) -> None:
-        soup, self.recipe_name = get_soup_from_url(url)
-        raw_ingredients = get_raw_ingredients_from_soup(soup)
-        raw_steps = get_raw_steps_from_soup(soup)
+        soup, recipe_name = get_soup_from_url(url)
+        self.parse(recipe_name, get_raw_ingredients_from_soup(soup), get_raw_steps_from_soup(soup))
+    
+    @classmethod
+    def from_raw(cls, recipe_name: str, raw_ingredients: List[Tag], raw_steps: List[Tag]) -> "Recipe":
+        """Creates a recipe from the raw ingredients and steps already extracted from a page."""
+        recipe = cls.__new__(cls)
+        recipe.parse(recipe_name, raw_ingredients, raw_steps)
+        return recipe
+    
+    def parse(self, recipe_name: str, raw_ingredients: List[Tag], raw_steps: List[Tag]) -> None:
+        self.recipe_name = recipe_name
         sentences_list = raw_steps_to_list_sentences(raw_steps) # each step is a list of sentences
         self.ingredients = parse_ingredients(raw_ingredients)
         self.ingredients_names = get_ingredients_names(self.ingredients)
@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Callable
 
-from .recipe import Recipe
+from .recipe_cache import load_recipe
 from .handle_questions import handle_specific_question_string, handle_fuzzy_what_questions_string, handle_fuzzy_how_questions_string
 
 class RasaState(Enum):
@@ -48,7 +48,7 @@ class RecipeRasaStateMachine:
     
     def parse_recipe(self) -> str:
         try:
-            self.recipe = Recipe(self.url)
+            self.recipe = load_recipe(self.url)
             return f"Successfully parsed recipe {self.recipe.recipe_name}."
         except Exception as e:
             raise Exception(f"Error while fetching the recipe: {e}. Please try again.")
@@ -1,15 +1,13 @@
 from typing import List, Union, Tuple, Dict
 import re
-import spacy
 from fuzzywuzzy import process
-nlp = spacy.load("en_core_web_sm")
-spacy_model = spacy.load("en_core_web_lg")
 
 
 from .ingredient import Ingredient
 from .ToActionFuctions import findTool, findMethod
 from .sentence_helper import imperative_to_normal
 from .spacy_helper import find_ingredient_index, find_num_index_list
+from .model_registry import get_model, get_hyphen_tokenizer, LARGE_MODEL
 
 # TODO: modify types (using self-defined types)
 DefineTemp = Tuple[str, str] # (temperature, unit)
@@ -27,14 +25,6 @@ ToolsType = Union[List[DefineTool], None]
 from .sentence_helper import celsius_to_fahren
 
 
-def custom_tokenizer(nlp):
-    infix_re = spacy.util.compile_infix_regex(nlp.Defaults.infixes + [r'(?<=[0-9])-'])
-    return spacy.tokenizer.Tokenizer(nlp.vocab, infix_finditer=infix_re.finditer)
-
-# tokenizer that ignore "-" character
-
-nlp.tokenizer = custom_tokenizer(nlp)
-
 # TODO: will import these functions from other files
 def to_temperature(sentences: List[str]) -> TemperatureType:
     temperatures=[]
@@ -79,9 +69,11 @@ def temperature_to_str(temperature: TemperatureType) -> str:
 def to_ingredients(sentences: List[str], ingredients:List[str]) -> List[IngredientsType]:
     matched_ingredients = []
 
+    # tokenizer that ignore "-" character (only lexical attributes are needed here)
+    tokenizer = get_hyphen_tokenizer()
     for sentence in sentences:
         sentence_match=[]
-        doc = nlp(sentence.lower())
+        doc = tokenizer(sentence.lower())
         # Extract noun phrases (potential ingredients)
         potential_ingredients = [chunk.text.strip() for chunk in doc if chunk.text.strip()]
         for potential in potential_ingredients:
@@ -178,7 +170,7 @@ class Action:
     def find_all_ingredients_info(self, ingredient_names: List[str]) -> Dict[str, str]:
         """Dictionary of (ingredient, info_str) pairs."""
         imperative_sentence = imperative_to_normal(self.sentence)
-        doc = spacy_model(imperative_sentence)
+        doc = get_model(LARGE_MODEL)(imperative_sentence)
         
         # try to find all the ingredients index in the sentence
         ingredients_index_dict = {}
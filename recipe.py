@@ -1,46 +1,86 @@
-from typing import Dict, Tuple, List
+from array import array
+from copy import copy
+from typing import Dict, Tuple, List, Union
 from bs4.element import Tag
 
 
-from web import get_soup_from_url, get_raw_ingredients_from_soup, get_raw_steps_from_soup
+from web import get_recipe_parts_from_url
+from extraction import extract_recipe_parts
+from snapshot import read_snapshot
 from sentence_helper import raw_steps_to_list_sentences
+from sentence_analysis import analyze_all, DEFAULT_BATCH_SIZE
 
-from ingredient import parse_ingredients, get_ingredients_names, Ingredient
-from step import parse_steps,parse_original_ingredients, parse_methods, parse_tools, Action
+from ingredient_matcher import IngredientMatcher
+from ingredient import parse_ingredients, get_ingredients_names, Ingredient, RawIngredient
+from step import parse_steps,parse_original_ingredients, parse_methods, parse_tools, Action, MethodsType
 from quantity_transformation import transform_quantity
 from transformation import transform_recipe_type
 
 class Recipe:
-    def __init__(self, url: str) -> None:
-        soup, self.recipe_name = get_soup_from_url(url)
-        raw_ingredients = get_raw_ingredients_from_soup(soup)
-        raw_steps = get_raw_steps_from_soup(soup)
+    def __init__(self, url: str, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        recipe_name, raw_ingredients, step_texts = get_recipe_parts_from_url(url)
+        self.parse(recipe_name, raw_ingredients, step_texts, batch_size)
+    
+    @classmethod
+    def from_raw(cls, recipe_name: str, raw_ingredients: List[Union[Tag, RawIngredient]], raw_steps: List[Union[Tag, str]],
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> "Recipe":
+        """Creates a recipe from the raw ingredients and steps (tags or texts) already extracted from a page."""
+        recipe = cls.__new__(cls)
+        recipe.parse(recipe_name, raw_ingredients, raw_steps, batch_size)
+        return recipe
+    
+    @classmethod
+    def from_html(cls, path_or_bytes: Union[str, bytes], encoding: str = "utf-8",
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> "Recipe":
+        """Creates a recipe from a saved page (a path to a .html, .html.gz or .html.zst file, or the html bytes) without any network access."""
+        html = path_or_bytes if isinstance(path_or_bytes, bytes) else read_snapshot(path_or_bytes)
+        recipe_name, raw_ingredients, step_texts = extract_recipe_parts(html, encoding)
+        return cls.from_raw(recipe_name, raw_ingredients, step_texts, batch_size)
+    
+    def parse(self, recipe_name: str, raw_ingredients: List[Union[Tag, RawIngredient]], raw_steps: List[Union[Tag, str]],
+              batch_size: int) -> None:
+        self.recipe_name = recipe_name
+        self.batch_size = batch_size
         sentences_list = raw_steps_to_list_sentences(raw_steps) # each step is a list of sentences
         self.sentences_list = sentences_list
         self.ingredients = parse_ingredients(raw_ingredients)
         self.ingredients_names = get_ingredients_names(self.ingredients)
-        self.steps = parse_steps(sentences_list, self.ingredients_names)
+        # tokenize all sentences in batches before the per-sentence extractors; the large model parse is only
+        # run when a field needing it is first used (methods, ingredients info, see materialize)
+        analyze_all(sentences_list, self.batch_size, profile=None)
+        # ingredient phrases are compiled once per recipe and shared by every step and action
+        self.ingredient_matcher = IngredientMatcher(self.ingredients_names)
+        self.steps = parse_steps(sentences_list, self.ingredients_names, self.ingredient_matcher)
         # for testing purposes
         self.temp_steps=sentences_list
 
         self.tools = parse_tools(self.steps)
-        self.methods = parse_methods(self.steps)
-        self.prime, self.verbs = self.methods
+        self._methods = None
         self.num_actions = sum([len(sentences) for sentences in sentences_list])
-        self.action_idx_to_idx_tuple = self.make_idx_tuple_dict()
+        self.action_idx_to_idx_tuple = self.make_idx_array()
         self.modification=None
     
     def transform(self, new_sentences_list: List[List[str]], new_ingredients: List[Ingredient], modification:str='') -> None:
+        """
+        Updates the recipe to the transformed sentences and ingredients. Only what changed is parsed again:
+        unchanged steps and actions are reused (see step.parse_steps), and so is the ingredient matcher if the
+        ingredient names are the same.
+        """
+        previous_steps = self.steps
         self.sentences_list = new_sentences_list
         self.ingredients = new_ingredients
-        self.ingredients_names = get_ingredients_names(self.ingredients)
-        self.steps = parse_steps(new_sentences_list, self.ingredients_names)
+        new_names = get_ingredients_names(self.ingredients)
+        if new_names != self.ingredients_names:
+            self.ingredient_matcher = IngredientMatcher(new_names)
+        self.ingredients_names = new_names
+        # unchanged sentences are already in the analysis cache
+        analyze_all(new_sentences_list, self.batch_size, profile=None)
+        self.steps = parse_steps(new_sentences_list, self.ingredients_names, self.ingredient_matcher, previous_steps)
         
         self.tools = parse_tools(self.steps)
-        self.methods = parse_methods(self.steps)
-        self.prime, self.verbs = self.methods
+        self._methods = None
         self.num_actions = sum([len(sentences) for sentences in new_sentences_list])
-        self.action_idx_to_idx_tuple = self.make_idx_tuple_dict()
+        self.action_idx_to_idx_tuple = self.make_idx_array()
         
         if self.modification:
             recipe_name=self.recipe_name.split(" (")[0]
@@ -54,27 +94,88 @@ class Recipe:
             self.modification=''
             self.recipe_name=recipe_name
         
+    @property
+    def methods(self) -> MethodsType:
+        """(prime, verbs) of the whole recipe, found on first use with the sentences parsed in batches."""
+        if self._methods is None:
+            analyze_all(self.sentences_list, self.batch_size, profile="parser")
+            self._methods = parse_methods(self.steps)
+        return self._methods
+    
+    @property
+    def prime(self) -> List[str]:
+        return self.methods[0]
+    
+    @property
+    def verbs(self) -> List[str]:
+        return self.methods[1]
+    
+    def materialize(self) -> "Recipe":
+        """
+        Computes every field that is otherwise computed on first use (methods, ingredients info of the actions),
+        with the sentences parsed in batches. For batch jobs that use the whole recipe.
+        """
+        analyze_all(self.sentences_list, self.batch_size, profile="parser")
+        for step in self.steps:
+            for action in step.actions:
+                action.materialize()
+        self.methods
+        return self
+    
+    def transformed(self, new_sentences_list: List[List[str]], new_ingredients: List[Ingredient], modification:str='') -> "Recipe":
+        """
+        Returns a new version of the recipe with the transformed sentences and ingredients, leaving this one
+        unchanged. Nothing is deep-copied: the two versions share the steps, actions and ingredients that didn't
+        change, which is safe since transform replaces attributes instead of updating them.
+        """
+        recipe = copy(self)
+        recipe.transform(new_sentences_list, new_ingredients, modification)
+        return recipe
+    
     def print_abstract(self) -> None:
+        # the methods need the large model parse: the other fields are shown first
         print(f"Recipe name: {self.recipe_name}")
         print(f"Number of actions: {self.num_actions}")
         print(f"Ingredients: {', '.join(self.ingredients_names)}")
-        print(f"Tools: {', '.join(self.tools)}")
+        print(f"Tools: {', '.join(self.tools)}", flush=True)
         print(f"Primary cooking method: {', '.join(self.prime)}")
         print(f"Other cooking methods: {', '.join(self.verbs)}")
     
+    def to_dict(self) -> Dict:
+        """Returns the parsed recipe as json-serializable dicts and lists (one entry per step, one per action)."""
+        return {
+            "recipe_name": self.recipe_name,
+            "ingredients": [{"string": ingredient.string.strip(), "quantity": ingredient.remaining_quantity,
+                             "unit": ingredient.unit, "name": ingredient.name, "preparation": ingredient.preparation}
+                            for ingredient in self.ingredients],
+            "tools": self.tools,
+            "prime": self.prime,
+            "verbs": self.verbs,
+            "steps": [[{"sentence": action.sentence, "temperature": action.temperature, "ingredients": action.ingredients,
+                        "time": action.time, "prime": action.method[0], "verbs": action.method[1], "tools": action.tools,
+                        "ingredients_info": {name: info[0] for name, info in action.ingredients_info.items()}}
+                       for action in step.actions] for step in self.steps],
+        }
+    
     def print_ingredients(self) -> None:
         for ingredient in self.ingredients:
             print(ingredient)
     
-    def make_idx_tuple_dict(self) -> Dict[int, Tuple[int, int]]:
-        idx_tuple_dict = {}
+    def make_idx_array(self) -> array:
+        """Returns the (step index, action index) pairs of the actions as one flat array: step, action, step, ..."""
+        idx_array = array("i")
         for step_idx, step in enumerate(self.steps):
-            for sentence_idx, _ in enumerate(step.actions):
-                idx_tuple_dict[len(idx_tuple_dict)] = (step_idx, sentence_idx)
-        return idx_tuple_dict
+            for sentence_idx in range(len(step.actions)):
+                idx_array.extend((step_idx, sentence_idx))
+        return idx_array
+    
+    def get_idx_tuple(self, action_index: int) -> Tuple[int, int]:
+        if not 0 <= action_index < self.num_actions:
+            raise KeyError(action_index)
+        return self.action_idx_to_idx_tuple[2 * action_index], self.action_idx_to_idx_tuple[2 * action_index + 1]
     
     def print_action(self, action_index: int) -> None:
-        step_idx, cur_action_idx = self.action_idx_to_idx_tuple[action_index]
+        step_idx, cur_action_idx = self.get_idx_tuple(action_index)
         action = self.steps[step_idx].actions[cur_action_idx]
         
         print(action.sentence)
@@ -89,12 +190,12 @@ class Recipe:
         print(f"Tools: {', '.join(action.tools)}")
     
     def get_action(self, action_index: int) -> Action:
-        step_idx, cur_action_idx = self.action_idx_to_idx_tuple[action_index]
+        step_idx, cur_action_idx = self.get_idx_tuple(action_index)
         return self.steps[step_idx].actions[cur_action_idx]
     
     def list_actions(self) -> None:
-        for i, index_tuple in enumerate(self.action_idx_to_idx_tuple.values()):
-            step_idx, cur_action_idx = index_tuple
+        for i in range(self.num_actions):
+            step_idx, cur_action_idx = self.get_idx_tuple(i)
             print(f"Step {i+1}: {self.steps[step_idx].actions[cur_action_idx].sentence}")
     
     
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from typing import Dict, List, Optional, Union
+
+from bs4.element import Tag
+
+from web import get_recipe_parts_from_url
+from model_registry import preload_models
+from ingredient import RawIngredient
+from recipe import Recipe
+
+# bump when Recipe, Step, Action or Ingredient change so old pickles are not loaded
+RECIPE_CACHE_VERSION = 5
+
+DEFAULT_CACHE_DIR = os.environ.get("RECIPE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".recipe_cache"))
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+def content_key(url: str, raw_ingredients: List[Union[Tag, RawIngredient]], raw_steps: List[Union[Tag, str]]) -> str:
+    """Returns a hash of the url and the extracted ingredient and step text."""
+    sha = hashlib.sha256()
+    sha.update(f"v{RECIPE_CACHE_VERSION}\0{url}\0".encode("utf-8"))
+    for raw in raw_ingredients:
+        sha.update(raw.text.strip().encode("utf-8") + b"\0")
+    sha.update(b"\0")
+    for raw in raw_steps:
+        text = raw if isinstance(raw, str) else raw.text
+        sha.update(text.strip().encode("utf-8") + b"\0")
+    return sha.hexdigest()
+
+class RecipeCache:
+    """
+    On-disk cache of parsed Recipe objects (ingredients, steps, actions, tools, methods and ingredients info).
+
+    Entries are pickles keyed by content_key. An index maps each url to its latest key so that a url seen less
+    than ttl_seconds ago is served without downloading the page. Entries older than ttl_seconds are dropped, and
+    the least recently used entries are evicted once the cache grows over max_bytes.
+    """
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self.load_index()
+
+    def load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == RECIPE_CACHE_VERSION:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {"version": RECIPE_CACHE_VERSION, "urls": {}, "entries": {}}
+
+    def save_index(self) -> None:
+        self.atomic_write(self.index_path, json.dumps(self.index).encode("utf-8"))
+
+    def atomic_write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def is_expired(self, entry: Dict) -> bool:
+        return time.time() - entry["created"] > self.ttl_seconds
+
+    def get_by_url(self, url: str) -> Optional[Recipe]:
+        """Returns the cached recipe of the url if it was fetched less than ttl_seconds ago, otherwise None."""
+        url_entry = self.index["urls"].get(url)
+        if url_entry is None or time.time() - url_entry["fetched"] > self.ttl_seconds:
+            return None
+        return self.get(url_entry["key"])
+
+    def get(self, key: str) -> Optional[Recipe]:
+        """Returns the cached recipe with the given content key, or None if missing, expired or unreadable."""
+        entry = self.index["entries"].get(key)
+        if entry is None:
+            return None
+        if self.is_expired(entry):
+            self.remove(key)
+            self.save_index()
+            return None
+        try:
+            with open(self.entry_path(key), "rb") as f:
+                payload = pickle.load(f)
+            if payload.get("version") != RECIPE_CACHE_VERSION:
+                raise ValueError("outdated cache entry")
+        except Exception:
+            self.remove(key)
+            self.save_index()
+            return None
+        entry["last_used"] = time.time()
+        self.save_index()
+        return payload["recipe"]
+
+    def put(self, url: str, key: str, recipe: Recipe) -> None:
+        data = pickle.dumps({"version": RECIPE_CACHE_VERSION, "recipe": recipe}, protocol=pickle.HIGHEST_PROTOCOL)
+        self.atomic_write(self.entry_path(key), data)
+        now = time.time()
+        self.index["entries"][key] = {"size": len(data), "created": now, "last_used": now}
+        self.mark_fetched(url, key)
+        self.evict()
+        self.save_index()
+
+    def mark_fetched(self, url: str, key: str) -> None:
+        """Records that the url was just downloaded and its content matches the entry key."""
+        self.index["urls"][url] = {"key": key, "fetched": time.time()}
+
+    def remove(self, key: str) -> None:
+        self.index["entries"].pop(key, None)
+        for url in [url for url, url_entry in self.index["urls"].items() if url_entry["key"] == key]:
+            del self.index["urls"][url]
+        try:
+            os.remove(self.entry_path(key))
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """Removes expired entries, then the least recently used ones until the cache fits in max_bytes."""
+        entries = self.index["entries"]
+        for key in [key for key, entry in entries.items() if self.is_expired(entry)]:
+            self.remove(key)
+        total = sum(entry["size"] for entry in entries.values())
+        for key in sorted(entries, key=lambda key: entries[key]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key]["size"]
+            self.remove(key)
+
+    def clear(self) -> None:
+        for key in list(self.index["entries"]):
+            self.remove(key)
+        self.index["urls"] = {}
+        self.save_index()
+
+_default_cache: Optional[RecipeCache] = None
+
+def get_default_cache() -> RecipeCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RecipeCache()
+    return _default_cache
+
+def load_recipe(url: str, cache: Optional[RecipeCache] = None, preload: bool = False) -> Recipe:
+    """
+    Returns the parsed recipe of the url, from the cache when possible.
+
+    - url fetched less than ttl ago: the cached recipe is returned without any download or parsing
+    - otherwise the page is downloaded, and the recipe is only parsed again if its ingredients or steps changed
+
+    preload: if the url isn't cached, the spacy models are loaded in the background while the page is downloaded.
+    """
+    cache = cache if cache is not None else get_default_cache()
+    recipe = cache.get_by_url(url)
+    if recipe is not None:
+        return recipe
+
+    if preload:
+        preload_models()
+    recipe_name, raw_ingredients, raw_steps = get_recipe_parts_from_url(url)
+    key = content_key(url, raw_ingredients, raw_steps)
+    recipe = cache.get(key)
+    if recipe is not None:
+        cache.mark_fetched(url, key)
+        cache.save_index()
+        return recipe
+
+    # the fields computed on first use are computed before pickling, so a cached recipe is never parsed again
+    recipe = Recipe.from_raw(recipe_name, raw_ingredients, raw_steps).materialize()
+    try:
+        cache.put(url, key, recipe)
+    except OSError as e:
+        # a read-only or full disk shouldn't prevent using the recipe
+        print(f"Warning: fail to cache recipe from {url}: {e}")
+    return recipe
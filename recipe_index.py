@@ -0,0 +1,147 @@
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ingredient_matcher import word_key
+
+# fields of the index, a term of a query is searched in all of them unless it is written "field:term"
+FIELDS = ("ingredient", "tool", "method")
+
+# (recipe id, index of the action in the recipe, as in Recipe.get_action)
+ActionId = Tuple[int, int]
+
+# the same few terms come back in every recipe
+@lru_cache(maxsize=65536)
+def canonical(term: str) -> str:
+    """Canonical form of an ingredient, tool or method: lowercased singular words ("Egg Yolks" -> "egg yolk")."""
+    return " ".join(key for key in (word_key(word) for word in term.split()) if key)
+
+def action_terms(action: Dict) -> Dict[str, Set[str]]:
+    """Returns the canonical terms of a Recipe.to_dict() action, by field."""
+    return {
+        "ingredient": {canonical(name) for name in action["ingredients"] or []},
+        "tool": {canonical(tool) for tool in action["tools"] or []},
+        "method": {canonical(method) for method in list(action["prime"] or []) + list(action["verbs"] or [])},
+    }
+
+class RecipeIndex:
+    """
+    Inverted index from the canonical ingredients, tools and methods of parsed recipes to the recipes and the
+    actions that use them, kept in memory and updated one recipe at a time.
+
+    Queries combine terms with AND, OR and NOT ("saucepan AND simmer AND butter", "bake OR roast",
+    "tool:oven AND NOT butter"); AND binds tighter than OR. Posting sets are intersected smallest first.
+    """
+    def __init__(self) -> None:
+        # (field, term) -> ids
+        self.recipe_postings: Dict[Tuple[str, str], Set[int]] = {}
+        self.action_postings: Dict[Tuple[str, str], Set[ActionId]] = {}
+        # recipe id -> (field, term) keys and actions, to delete it
+        self.recipe_keys: Dict[int, Set[Tuple[str, str]]] = {}
+        self.recipe_actions: Dict[int, Dict[ActionId, Set[Tuple[str, str]]]] = {}
+        self.names: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self.names
+
+    def add(self, recipe_id: int, recipe_dict: Dict) -> None:
+        """Indexes a Recipe.to_dict() dict under recipe_id, replacing the recipe indexed under it before."""
+        if recipe_id in self.names:
+            self.delete(recipe_id)
+        self.names[recipe_id] = recipe_dict["recipe_name"]
+        keys = {("ingredient", canonical(ingredient["name"])) for ingredient in recipe_dict["ingredients"]}
+        actions = {}
+        actions_list = [action for step in recipe_dict["steps"] for action in step]
+        for action_index, action in enumerate(actions_list):
+            action_keys = {(field, term) for field, terms in action_terms(action).items() for term in terms if term}
+            actions[(recipe_id, action_index)] = action_keys
+            keys |= action_keys
+        keys = {key for key in keys if key[1]}
+        for key in keys:
+            self.recipe_postings.setdefault(key, set()).add(recipe_id)
+        for action_id, action_keys in actions.items():
+            for key in action_keys:
+                self.action_postings.setdefault(key, set()).add(action_id)
+        self.recipe_keys[recipe_id] = keys
+        self.recipe_actions[recipe_id] = actions
+
+    def add_recipe(self, recipe_id: int, recipe) -> None:
+        """Indexes a Recipe (its lazy fields are computed, see Recipe.materialize)."""
+        self.add(recipe_id, recipe.materialize().to_dict())
+
+    def add_all(self, recipe_dicts: Iterable[Dict], first_id: Optional[int] = None) -> List[int]:
+        """Indexes recipes under consecutive ids (after the largest one indexed by default), returns the ids."""
+        next_id = first_id if first_id is not None else max(self.names, default=-1) + 1
+        ids = []
+        for recipe_dict in recipe_dicts:
+            self.add(next_id, recipe_dict)
+            ids.append(next_id)
+            next_id += 1
+        return ids
+
+    def delete(self, recipe_id: int) -> None:
+        if recipe_id not in self.names:
+            raise KeyError(recipe_id)
+        for key in self.recipe_keys.pop(recipe_id):
+            remove_posting(self.recipe_postings, key, recipe_id)
+        for action_id, action_keys in self.recipe_actions.pop(recipe_id).items():
+            for key in action_keys:
+                remove_posting(self.action_postings, key, action_id)
+        del self.names[recipe_id]
+
+    def term_keys(self, term: str) -> List[Tuple[str, str]]:
+        field, _, text = term.partition(":")
+        if text and field in FIELDS:
+            return [(field, canonical(text))]
+        return [(field, canonical(term)) for field in FIELDS]
+
+    def term_ids(self, term: str, postings: Dict) -> Set:
+        """Returns the ids of a term (in any field if it isn't qualified)."""
+        keys = [key for key in self.term_keys(term) if key in postings]
+        if len(keys) == 1:
+            return postings[keys[0]]
+        return set().union(*[postings[key] for key in keys])
+
+    def search(self, query: str, postings: Dict, all_ids: Callable[[], Set]) -> Set:
+        """all_ids is only called for a clause made of NOT terms only."""
+        result = set()
+        for clause in query.split(" OR "):
+            included = []
+            excluded = []
+            for term in clause.split(" AND "):
+                term = term.strip()
+                if term.startswith("NOT "):
+                    excluded.append(self.term_ids(term[4:].strip(), postings))
+                elif term:
+                    included.append(self.term_ids(term, postings))
+            # smallest posting set first: the intersection is never larger than it
+            included.sort(key=len)
+            if len(included) >= 2:
+                ids = included[0] & included[1]
+            else:
+                ids = set(included[0]) if included else all_ids()
+            for term_ids in included[2:]:
+                if not ids:
+                    break
+                ids &= term_ids
+            for term_ids in excluded:
+                ids -= term_ids
+            result |= ids
+        return result
+
+    def query(self, query: str) -> List[int]:
+        """Returns the ids of the recipes matching the query, in ascending order."""
+        return sorted(self.search(query, self.recipe_postings, lambda: set(self.names)))
+
+    def query_actions(self, query: str) -> List[ActionId]:
+        """Returns the (recipe id, action index) of the actions matching the query by themselves."""
+        return sorted(self.search(query, self.action_postings,
+                                  lambda: {action_id for actions in self.recipe_actions.values() for action_id in actions}))
+
+def remove_posting(postings: Dict, key: Tuple[str, str], value) -> None:
+    ids = postings[key]
+    ids.discard(value)
+    if not ids:
+        del postings[key]
@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from time_temperature import time_seconds, temperature_fahrenheit
+
+# one .npy file per column in the table directory, the vocabularies and recipe names in vocab.json
+COLUMNS = ["recipe_id", "step_idx", "action_idx", "time_low", "time_high", "temperature",
+           "tool_offsets", "tool_ids", "method_offsets", "method_ids", "verb_offsets", "verb_ids"]
+VOCAB_FILE = "vocab.json"
+
+class RecipeTableBuilder:
+    """
+    Flattens parsed recipes (Recipe.to_dict() dicts, as written by ingest.py) into the columns of a RecipeTable,
+    one row per action. Tools, primary methods and other methods (verbs) are stored as ids into vocabularies,
+    one list of ids per action (offsets + ids, like a CSR matrix).
+    """
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.sources: List[str] = []
+        self.vocabs: Dict[str, Dict[str, int]] = {"tool": {}, "method": {}, "verb": {}}
+        self.columns: Dict[str, List] = {"recipe_id": [], "step_idx": [], "action_idx": [], "time_low": [],
+                                         "time_high": [], "temperature": []}
+        self.ids: Dict[str, List[int]] = {"tool": [], "method": [], "verb": []}
+        self.offsets: Dict[str, List[int]] = {"tool": [0], "method": [0], "verb": [0]}
+
+    def add(self, recipe_dict: Dict, source: str = "") -> int:
+        """Adds the actions of a recipe and returns its recipe id."""
+        recipe_id = len(self.names)
+        self.names.append(recipe_dict["recipe_name"])
+        self.sources.append(source)
+        for step_idx, step in enumerate(recipe_dict["steps"]):
+            for action_idx, action in enumerate(step):
+                seconds = time_seconds(action["time"]) if action["time"] else None
+                fahrenheit = temperature_fahrenheit(action["temperature"]) if action["temperature"] else None
+                self.columns["recipe_id"].append(recipe_id)
+                self.columns["step_idx"].append(step_idx)
+                self.columns["action_idx"].append(action_idx)
+                self.columns["time_low"].append(seconds[0] if seconds else np.nan)
+                self.columns["time_high"].append(seconds[1] if seconds else np.nan)
+                self.columns["temperature"].append(fahrenheit if fahrenheit is not None else np.nan)
+                for kind, field in (("tool", "tools"), ("method", "prime"), ("verb", "verbs")):
+                    vocab = self.vocabs[kind]
+                    self.ids[kind].extend(vocab.setdefault(word, len(vocab)) for word in action[field] or [])
+                    self.offsets[kind].append(len(self.ids[kind]))
+        return recipe_id
+
+    def add_jsonl(self, path: str) -> int:
+        """Adds the recipes of an ingest.py output file (records with an error are skipped), returns their number."""
+        count = 0
+        for record in read_jsonl(path):
+            if "recipe" in record:
+                self.add(record["recipe"], record.get("source", ""))
+                count += 1
+        return count
+
+    def build(self) -> "RecipeTable":
+        columns = {
+            "recipe_id": np.array(self.columns["recipe_id"], dtype=np.int32),
+            "step_idx": np.array(self.columns["step_idx"], dtype=np.int32),
+            "action_idx": np.array(self.columns["action_idx"], dtype=np.int32),
+            "time_low": np.array(self.columns["time_low"], dtype=np.float64),
+            "time_high": np.array(self.columns["time_high"], dtype=np.float64),
+            "temperature": np.array(self.columns["temperature"], dtype=np.float64),
+        }
+        for kind in self.ids:
+            columns[f"{kind}_offsets"] = np.array(self.offsets[kind], dtype=np.int64)
+            columns[f"{kind}_ids"] = np.array(self.ids[kind], dtype=np.int32)
+        vocabs = {kind: list(vocab) for kind, vocab in self.vocabs.items()}
+        return RecipeTable(columns, vocabs, list(self.names), list(self.sources))
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+class RecipeTable:
+    """
+    Actions of many recipes as numpy columns (one row per action), for vectorized aggregations over a corpus.
+    Times are in seconds and temperatures in degrees F (NaN when the action has none, or a heat level).
+
+    A saved table is loaded memory-mapped: the columns are read from disk as the aggregations use them.
+    """
+    def __init__(self, columns: Dict[str, np.ndarray], vocabs: Dict[str, List[str]], names: List[str],
+                 sources: List[str]) -> None:
+        self.columns = columns
+        self.vocabs = vocabs
+        self.names = names
+        self.sources = sources
+
+    @classmethod
+    def from_recipes(cls, recipe_dicts: Iterable[Dict]) -> "RecipeTable":
+        builder = RecipeTableBuilder()
+        for recipe_dict in recipe_dicts:
+            builder.add(recipe_dict)
+        return builder.build()
+
+    @property
+    def num_actions(self) -> int:
+        return len(self.columns["recipe_id"])
+
+    @property
+    def num_recipes(self) -> int:
+        return len(self.names)
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in COLUMNS:
+            np.save(os.path.join(directory, f"{name}.npy"), self.columns[name])
+        with open(os.path.join(directory, VOCAB_FILE), "w", encoding="utf-8") as f:
+            json.dump({"vocabs": self.vocabs, "names": self.names, "sources": self.sources}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "RecipeTable":
+        mmap_mode = "r" if mmap else None
+        columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in COLUMNS}
+        with open(os.path.join(directory, VOCAB_FILE), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        return cls(columns, vocab["vocabs"], vocab["names"], vocab["sources"])
+
+    def entry_rows(self, kind: str) -> np.ndarray:
+        """Returns the action row of each id of a kind ("tool", "method" or "verb")."""
+        offsets = self.columns[f"{kind}_offsets"]
+        return np.repeat(np.arange(self.num_actions), np.diff(offsets))
+
+    def recipe_seconds(self) -> np.ndarray:
+        """
+        Returns the total time of each recipe in seconds (the high end of the ranges, actions without time count 0),
+        NaN for the recipes without any timed action: their time is unknown, not 0.
+        """
+        recipe_id = self.columns["recipe_id"]
+        time_high = np.asarray(self.columns["time_high"])
+        timed = np.bincount(recipe_id, weights=~np.isnan(time_high), minlength=self.num_recipes)
+        seconds = np.bincount(recipe_id, weights=np.nan_to_num(time_high), minlength=self.num_recipes)
+        seconds[timed == 0] = np.nan
+        return seconds
+
+    def recipe_mask(self, max_seconds: Optional[float] = None, min_seconds: Optional[float] = None) -> np.ndarray:
+        """Returns the boolean mask of the recipes whose total time is within the bounds (never the untimed ones)."""
+        seconds = self.recipe_seconds()
+        mask = np.ones(self.num_recipes, dtype=bool)
+        if max_seconds is not None:
+            mask &= seconds <= max_seconds
+        if min_seconds is not None:
+            mask &= seconds >= min_seconds
+        return mask
+
+    def counts(self, kind: str, action_mask: Optional[np.ndarray] = None, per_recipe: bool = False) -> Dict[str, int]:
+        """
+        Returns the number of actions of each tool / method / verb, most frequent first, optionally only for the
+        actions of action_mask. With per_recipe, the number of recipes using it instead.
+        """
+        ids = np.asarray(self.columns[f"{kind}_ids"])
+        rows = self.entry_rows(kind)
+        if action_mask is not None:
+            keep = np.asarray(action_mask)[rows]
+            ids, rows = ids[keep], rows[keep]
+        if per_recipe:
+            # one entry per (recipe, id) pair
+            pairs = np.unique(np.asarray(self.columns["recipe_id"])[rows].astype(np.int64) * len(self.vocabs[kind]) + ids)
+            ids = pairs % max(len(self.vocabs[kind]), 1)
+        counts = np.bincount(ids, minlength=len(self.vocabs[kind]))
+        order = np.argsort(-counts, kind="stable")
+        return {self.vocabs[kind][i]: int(counts[i]) for i in order if counts[i] > 0}
+
+    def method_counts_under(self, max_seconds: float, per_recipe: bool = True) -> Dict[str, int]:
+        """Which primary cooking methods dominate the recipes taking at most max_seconds."""
+        action_mask = self.recipe_mask(max_seconds=max_seconds)[self.columns["recipe_id"]]
+        return self.counts("method", action_mask, per_recipe)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a columnar table of the actions of parsed recipes (ingest.py output).")
+    parser.add_argument("inputs", nargs="+", help="json lines files written by ingest.py")
+    parser.add_argument("output", help="directory of the table (one .npy file per column)")
+    args = parser.parse_args()
+
+    builder = RecipeTableBuilder()
+    for path in args.inputs:
+        builder.add_jsonl(path)
+    table = builder.build()
+    table.save(args.output)
+    table = RecipeTable.load(args.output)
+    print(f"{table.num_recipes} recipes, {table.num_actions} actions")
+    top = list(table.method_counts_under(30 * 60).items())[:10]
+    print("Most common methods of recipes under 30 minutes: " + ", ".join(f"{method} ({count})" for method, count in top))
+
+if __name__ == "__main__":
+    main()
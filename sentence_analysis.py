@@ -0,0 +1,103 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from spacy.tokens import Doc
+
+from model_registry import get_hyphen_tokenizer, run_pipeline, pipe_pipeline, profile_covers, LARGE_MODEL
+from sentence_helper import imperative_to_normal, imperative_to_clause
+
+# number of sentences whose analysis is kept in memory
+ANALYSIS_CACHE_SIZE = 4096
+# number of texts sent to nlp.pipe at once
+DEFAULT_BATCH_SIZE = 64
+
+class SentenceAnalysis:
+    """
+    spacy analysis of one step sentence, shared by every extractor that reads the sentence.
+
+    Each view is computed on first use and kept for later calls:
+    - tokens: the lowercased sentence tokenized by the hyphen tokenizer (to_ingredients)
+    - normal_doc: large model doc of the sentence as a normal sentence "You ..." (ingredients info, quantity scaling)
+    - clause_doc: large model doc of the sentence without its leading "Word, " (verb relations, vague how)
+
+    Large model views take the profile (see model_registry.PROFILES) the extractor needs. A doc is only
+    processed again if it was made with a cheaper profile.
+    """
+    def __init__(self, sentence: str) -> None:
+        self.sentence = sentence
+        self._tokens: Optional[Doc] = None
+        # normalized text -> (doc, profile), both views usually share one doc
+        self._large_docs: Dict[str, Tuple[Doc, str]] = {}
+
+    @property
+    def tokens(self) -> Doc:
+        if self._tokens is None:
+            self._tokens = get_hyphen_tokenizer()(self.sentence.lower())
+        return self._tokens
+
+    def normal_doc(self, profile: str = "parser") -> Doc:
+        return self.get_large_doc(imperative_to_normal(self.sentence), profile)
+
+    def clause_doc(self, profile: str = "parser") -> Doc:
+        return self.get_large_doc(imperative_to_clause(self.sentence), profile)
+
+    def large_texts(self) -> List[str]:
+        """Returns the normalized texts of the large model views."""
+        normal = imperative_to_normal(self.sentence)
+        clause = imperative_to_clause(self.sentence)
+        return [normal] if normal == clause else [normal, clause]
+
+    def has_large_doc(self, text: str, profile: str) -> bool:
+        return text in self._large_docs and profile_covers(self._large_docs[text][1], profile)
+
+    def get_large_doc(self, text: str, profile: str) -> Doc:
+        if not self.has_large_doc(text, profile):
+            self._large_docs[text] = (run_pipeline(LARGE_MODEL, text, profile), profile)
+        return self._large_docs[text][0]
+
+def normalize_sentence(sentence: str) -> str:
+    return sentence.strip()
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _analyze_normalized(sentence: str) -> SentenceAnalysis:
+    return SentenceAnalysis(sentence)
+
+def analyze(sentence: str) -> SentenceAnalysis:
+    """Returns the (cached) analysis of the sentence."""
+    return _analyze_normalized(normalize_sentence(sentence))
+
+def clear_analysis_cache() -> None:
+    _analyze_normalized.cache_clear()
+
+def analyze_all(sentences_list: List[List[str]], batch_size: int = DEFAULT_BATCH_SIZE,
+                profile: Optional[str] = "parser") -> List[SentenceAnalysis]:
+    """
+    Returns the analysis of every sentence of a recipe (flattened).
+
+    Views that are not computed yet (or computed with a cheaper profile) are filled in batches with nlp.pipe,
+    one pass per pipeline, so the extractors later read precomputed docs. With profile None only the tokens
+    are computed, the large model views are left for later.
+    """
+    analyses = [analyze(sentence) for sentences in sentences_list for sentence in sentences]
+    
+    missing_tokens = [analysis for analysis in analyses if analysis._tokens is None]
+    if missing_tokens:
+        lowered = [analysis.sentence.lower() for analysis in missing_tokens]
+        for analysis, doc in zip(missing_tokens, get_hyphen_tokenizer().pipe(lowered, batch_size=batch_size)):
+            analysis._tokens = doc
+    
+    if profile is None:
+        return analyses
+    
+    # normalized text -> analyses waiting for its doc (the same text is parsed once)
+    missing_docs: Dict[str, List[SentenceAnalysis]] = {}
+    for analysis in analyses:
+        for text in analysis.large_texts():
+            if not analysis.has_large_doc(text, profile):
+                missing_docs.setdefault(text, []).append(analysis)
+    if missing_docs:
+        texts = list(missing_docs)
+        for text, doc in zip(texts, pipe_pipeline(LARGE_MODEL, texts, profile, batch_size)):
+            for analysis in missing_docs[text]:
+                analysis._large_docs[text] = (doc, profile)
+    return analyses
@@ -17,10 +17,30 @@ def imperative_to_normal(sentence: str) -> str:
     else:
         return f"You {sentence[0].lower()}{sentence[1:]}."
 
-def raw_steps_to_list_sentences(raw_steps: List[Tag]) -> List[List[str]]:
+def imperative_to_clause(sentence: str) -> str:
+    """Like imperative_to_normal, but also drops leading spaces and a leading single word followed by "," (e.g. "Meanwhile, ")."""
+    try:        
+        while sentence.startswith(" "):
+            sentence = sentence[1:]
+        if sentence == '' or sentence.startswith("You"):
+            return sentence
+        if "," in sentence:
+            i = sentence.index(",")
+            if " " not in sentence[:i]:
+                sentence = sentence[i+2 :]
+        if sentence.endswith("."):
+            return f"You {sentence[0].lower()}{sentence[1:]}"
+        else:
+            return f"You {sentence[0].lower()}{sentence[1:]}."
+    
+    except Exception:
+        return sentence
+
+def raw_steps_to_list_sentences(raw_steps: List[Union[Tag, str]]) -> List[List[str]]:
+    """Splits each step (a tag or its text) into sentences."""
     sentences_list = []
     for step in raw_steps:
-        step_sentences = split_into_sentences(step.text)
+        step_sentences = split_into_sentences(step if isinstance(step, str) else step.text)
         sentences_list.append([add_punctuation(sentence) for sentence in step_sentences])
     return sentences_list
 
@@ -0,0 +1,52 @@
+import re
+from typing import Dict, List, NamedTuple, Tuple
+
+from keyword_matcher import trie_pattern
+
+class SpanEdit(NamedTuple):
+    start: int      # span of the replaced text in the original sentence
+    end: int
+    old: str
+    new: str
+
+class SentenceRewriter:
+    """
+    Replaces the phrases of a mapping in a sentence in one pass, compiled once into a single regex.
+
+    - longest match first: "olive oil" is replaced as a whole before "oil" is considered
+    - whole words only: "oil" is not replaced inside "boil"
+    - each part of the sentence is replaced at most once, so a replacement is never rewritten by another mapping
+
+    Phrases are matched case-insensitively and a capitalized phrase gets a capitalized replacement.
+    """
+    def __init__(self, mapping: Dict[str, str]) -> None:
+        self.mapping: Dict[str, str] = {}
+        for old, new in mapping.items():
+            # the first mapping of a phrase wins
+            if old.strip() and old.lower() not in self.mapping:
+                self.mapping[old.lower()] = new
+        self.regex = re.compile(r"(?<!\w)(?:" + trie_pattern(list(self.mapping)) + r")(?!\w)", re.IGNORECASE) if self.mapping else None
+
+    def rewrite(self, sentence: str) -> Tuple[str, List[SpanEdit]]:
+        """Returns the rewritten sentence and the edits made, in order."""
+        if self.regex is None:
+            return sentence, []
+        pieces = []
+        edits = []
+        last = 0
+        for match in self.regex.finditer(sentence):
+            old = match.group()
+            new = self.mapping[old.lower()]
+            if new.lower() == old.lower():
+                # phrases mapped to themselves are matched only to protect their words ("oil" in "olive oil")
+                continue
+            if old[:1].isupper() and new:
+                new = new[0].upper() + new[1:]
+            pieces.append(sentence[last:match.start()])
+            pieces.append(new)
+            edits.append(SpanEdit(match.start(), match.end(), old, new))
+            last = match.end()
+        if not edits:
+            return sentence, []
+        pieces.append(sentence[last:])
+        return "".join(pieces), edits
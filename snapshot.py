@@ -0,0 +1,81 @@
+import gzip
+import os
+import tarfile
+from typing import BinaryIO, Iterable, Iterator, Tuple
+
+try:
+    import zstandard
+except ImportError:   # optional dependency, only needed for .zst snapshots
+    zstandard = None
+
+PAGE_SUFFIXES = (".html", ".htm")
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".tar.zst", ".tzst")
+
+def strip_compressed_suffix(name: str) -> str:
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def is_page(name: str) -> bool:
+    """True for saved pages, compressed or not (e.g. "pie.html", "pie.html.gz", "pie.htm.zst")."""
+    return strip_compressed_suffix(name.lower()).endswith(PAGE_SUFFIXES)
+
+def is_tar(name: str) -> bool:
+    return name.lower().endswith(TAR_SUFFIXES)
+
+def require_zstandard() -> None:
+    if zstandard is None:
+        raise Exception("zstandard is required to read .zst snapshots (pip install zstandard)")
+
+def decompress(name: str, data: bytes) -> bytes:
+    """Returns the page bytes of a snapshot, decompressing it according to its name."""
+    if name.lower().endswith(".gz"):
+        return gzip.decompress(data)
+    if name.lower().endswith(".zst"):
+        require_zstandard()
+        return zstandard.ZstdDecompressor().stream_reader(data).read()
+    return data
+
+def read_snapshot(path: str) -> bytes:
+    """Returns the html of a saved page (.html, .html.gz or .html.zst)."""
+    with open(path, "rb") as f:
+        return decompress(path, f.read())
+
+def iter_tar(path: str) -> Iterator[Tuple[str, bytes]]:
+    """Yields (archive path/member name, html) for every page of a tar archive, reading it as a stream."""
+    with open(path, "rb") as f:
+        if path.lower().endswith((".zst", ".tzst")):
+            require_zstandard()
+            stream: BinaryIO = zstandard.ZstdDecompressor().stream_reader(f)
+            mode = "r|"
+        else:
+            stream = f
+            mode = "r|*"
+        with tarfile.open(fileobj=stream, mode=mode) as archive:
+            for member in archive:
+                if not member.isfile() or not is_page(member.name):
+                    continue
+                data = archive.extractfile(member).read()
+                yield f"{path}/{member.name}", decompress(member.name, data)
+
+def iter_snapshots(paths: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yields (name, html) for every saved page under the given paths, one page at a time.
+
+    A path can be a page, a tar archive or a directory, which is walked recursively in sorted order (other files
+    in directories are skipped).
+    Pages can be gzip (.gz) or zstd (.zst) compressed, and so can tar archives.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if is_page(name) or is_tar(name):
+                        yield from iter_snapshots([os.path.join(root, name)])
+        elif is_tar(path):
+            yield from iter_tar(path)
+        else:
+            yield path, read_snapshot(path)
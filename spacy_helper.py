@@ -2,6 +2,9 @@ import spacy
 from spacy import Language
 from typing import Union, List
 
+# pipeline profile (see model_registry.PROFILES) of the docs given to the functions below: POS and dependencies
+INDEX_PROFILE = "parser"
+
 def find_most_related_verb(noun_chunk: spacy.tokens.Span) -> Union[spacy.tokens.Token, None]:
     """Find the most related verb of a noun chunk (the closest ancestor that is a verb)."""
     cur_token = noun_chunk.root
@@ -1,71 +1,40 @@
-from typing import List, Union, Tuple, Dict
-import re
-import spacy
-from fuzzywuzzy import process
-nlp = spacy.load("en_core_web_sm")
-spacy_model = spacy.load("en_core_web_lg")
+import sys
+from typing import List, Optional, Union, Tuple, Dict
+from fuzzy_match import extract_one_batch
 import warnings
 warnings.filterwarnings("ignore")
 
 
 
 from ingredient import Ingredient
-from ToActionFuctions import findTool, findMethod
-from sentence_helper import imperative_to_normal
-from spacy_helper import find_ingredient_index, find_num_index_list
+from ToActionFuctions import findTool, findMethod, answerVague
+from spacy_helper import find_num_index_list, INDEX_PROFILE
+from ingredient_matcher import IngredientMatcher, matcher_for, STRIP_CHARACTERS
+from sentence_analysis import analyze
 
 # TODO: modify types (using self-defined types)
 DefineTemp = Tuple[str, str] # (temperature, unit)
 DefineIngrdnt = str
 DefineTime = Tuple[float, float, str]   # (lower, higher, unit)
-DefineMethod = Tuple[List[str], List[str]] # (verbs, prime)
+DefineMethod = Tuple[Tuple[str, ...], Tuple[str, ...]] # (prime, verbs)
 DefineTool = str
 
 TemperatureType = Union[DefineTemp, None]
 IngredientsType = Union[List[DefineIngrdnt], None]
 TimeType = Union[DefineTime, None]
 MethodsType = DefineMethod
-ToolsType = Union[List[DefineTool], None]
-from sentence_helper import celsius_to_fahren
+ToolsType = Union[Tuple[DefineTool, ...], None]
+from time_temperature import scan_sentence, SentenceReadings
 
 
-def custom_tokenizer(nlp):
-    infix_re = spacy.util.compile_infix_regex(nlp.Defaults.infixes + [r'(?<=[0-9])-'])
-    return spacy.tokenizer.Tokenizer(nlp.vocab, infix_finditer=infix_re.finditer)
-
-# tokenizer that ignore "-" character
-
-nlp.tokenizer = custom_tokenizer(nlp)
-
 # TODO: will import these functions from other files
-def to_temperature(sentences: List[str]) -> TemperatureType:
-    temperatures=[]
-    temperature=[]
-    for sentence in sentences:
-        tokens = sentence.split()  # Split the sentence into tokens
-        for i in range(len(tokens) - 1):
-            token = tokens[i]
-            next_token = tokens[i + 1]
-
-            if token.isnumeric():
-                if next_token.lower() in ["degrees", "degree", "°"]:
-                    temperatures.append((token, tokens[i+2]))
-            else:
-                if (
-                    token.lower() in ["low", "medium", "medium-high", "high"]
-                    and  "heat" in next_token.lower()
-                ):
-                    temperatures.append((token, "heat"))
-
-    for temp, unit in temperatures:
-        if unit.strip() in ["C","c","Celsius","celsius"]:
-            converted_temp=celsius_to_fahren(float(temp))
-            temperature=[str(converted_temp), "F"]
-        elif unit.strip() in ["F","f","Fahrenheit","fahrenheit"]:
-            temperature=[str(temp), "F"]
-        else:
-            temperature=[temp, unit]
-    return tuple(temperature) if temperature else None
+def to_temperature(sentences: List[str], readings_list: Optional[List[SentenceReadings]] = None) -> TemperatureType:
+    """Returns the last temperature of the step: ("350", "F") (celsius converted) or (heat level, "heat")."""
+    readings_list = readings_list if readings_list is not None else [scan_sentence(sentence) for sentence in sentences]
+    temperatures = [reading for readings in readings_list for reading in readings.temperatures]
+    if not temperatures:
+        return None
+    return (temperatures[-1].value, temperatures[-1].unit)
 
 def temperature_to_str(temperature: TemperatureType) -> str:
     """Converts a temperature tuple to a string.
@@ -78,43 +47,52 @@ def temperature_to_str(temperature: TemperatureType) -> str:
         temp, unit = temperature
         return f"{temp} degrees {unit}"
 
-def to_ingredients(sentences: List[str], ingredients:List[str]):
+def to_ingredients(sentences: List[str], ingredients:List[str], matcher: Optional[IngredientMatcher] = None):
     matched_ingredients = []
     match_mappings={}
+    matcher = matcher_for(ingredients, matcher)
 
+    phrases_list = []
+    potentials_list = []
     for sentence in sentences:
-        sentence_match=[]
-        doc = nlp(sentence.lower())
+        # lowercased tokens from the tokenizer that ignore "-" character (profile "tokens-only": text and is_stop)
+        doc = analyze(sentence).tokens
+        # whole ingredient phrases ("egg yolks") are linked directly, the other tokens are fuzzy matched
+        mentions = matcher.find_mentions(doc)
+        phrases_list.append([(doc[start:end].text.strip(STRIP_CHARACTERS), name) for start, end, name in mentions])
+        covered = {i for start, end, _ in mentions for i in range(start, end)}
         # Extract noun phrases (potential ingredients)
-        potential_ingredients = [token.text.strip() for token in doc if token.text.strip() and not token.is_stop]
-        for potential in potential_ingredients:
-            try:
-                if str(potential).strip():
-                    match, score = process.extractOne(str(potential), ingredients)
-                    if score >= 80:
-                        sentence_match.append(match)
-                        val=str(potential).replace(",","").replace(".","").strip()
-                        match_mappings[val]=match
-            except TypeError:
-                pass
+        potentials_list.append([token.text.strip() for token in doc
+                                if token.text.strip() and not token.is_stop and token.i not in covered])
+
+    # every token of the step is scored against every ingredient at once (same results as process.extractOne)
+    best_matches = iter(extract_one_batch([potential for potentials in potentials_list for potential in potentials], ingredients))
+    for phrases, potentials in zip(phrases_list, potentials_list):
+        sentence_match=[]
+        for phrase, name in phrases:
+            sentence_match.append(name)
+            match_mappings[phrase.replace(",","").replace(".","").strip()]=name
+        for potential in potentials:
+            best = next(best_matches)
+            if best is not None:
+                match, score = best
+                sentence_match.append(match)
+                val=str(potential).replace(",","").replace(".","").strip()
+                match_mappings[val]=match
         unique_matched_ingredients = list(set(sentence_match))
         matched_ingredients.append(unique_matched_ingredients)
 
     return matched_ingredients, match_mappings
 
-def to_time(sentences: List[str]) -> List[TimeType]:
+def to_time(sentences: List[str], readings_list: Optional[List[SentenceReadings]] = None) -> List[TimeType]:
+    """Returns the first time of each sentence: (low, high, unit), e.g. ("10", "15", "minutes")."""
+    readings_list = readings_list if readings_list is not None else [scan_sentence(sentence) for sentence in sentences]
     times=[]
-    for idx, sentence in enumerate(sentences):
-        pattern = r'\b(\d+)(?:\D*?(?:to|-)\D*?(\d+))?\D*?(minutes?|mins?|hours?|hrs?|seconds?|secs?|days?)\b'
-        matches = re.findall(pattern, sentence)
-        if len(matches)>0:
-            low, high=matches[0][0], matches[0][1]
-            if len(matches[0][1])==0:
-                high=matches[0][0]
-            times.append((low,high, matches[0][2]))
+    for readings in readings_list:
+        if readings.times:
+            times.append((readings.times[0].low, readings.times[0].high, sys.intern(readings.times[0].unit)))
         else:
             times.append(None)
-
     return times
 
 def time_to_str(time: TimeType) -> str:
@@ -132,15 +110,23 @@ def time_to_str(time: TimeType) -> str:
         else:
             return f"{low} to {high} {unit}"
 
+# tools and methods come from small vocabularies: every action with the same ones shares one tuple
+_interned_tuples: Dict[Tuple, Tuple] = {}
+
+def intern_tuple(items) -> Tuple:
+    """Returns the shared tuple of the (interned) strings or tuples."""
+    items = tuple(sys.intern(item) if isinstance(item, str) else item for item in items)
+    return _interned_tuples.setdefault(items, items)
+
 def to_method(sentences: List[str]) -> List[MethodsType]:
     prime, verbs = findMethod(sentences)
     method_res = []
     for i in range(len(sentences)):
-        method_res.append((prime[i], verbs[i]))
+        method_res.append(intern_tuple((intern_tuple(prime[i]), intern_tuple(verbs[i]))))
     return method_res
 
 def to_tools(sentences: List[str]) -> List[ToolsType]:
-    return findTool(sentences)
+    return [intern_tuple(tools) for tools in findTool(sentences)]
 
 
 
@@ -164,15 +150,54 @@ def collect_methods(method_list: List[MethodsType]) -> MethodsType:
     return list(set(prime)), list(set(verbs))
 
 class Action:
+    """
+    One sentence of a step. The fields that need the large model parse (method, ingredients_info and
+    vague_actions) are computed on first use and kept; materialize computes them all at once.
+    """
+    # no per-instance dict: many parsed recipes are kept in memory
+    __slots__ = ("sentence", "temperature", "ingredients", "time", "tools",
+                 "_method", "_ingredients_info", "_matcher", "_vague_actions")
+    
     def __init__(self, sentence: str, temperature: TemperatureType, ingredients: IngredientsType, time: TimeType,
-                 method: MethodsType, tools: ToolsType) -> None:
+                 method: Optional[MethodsType], tools: ToolsType, matcher: Optional[IngredientMatcher] = None,
+                 ingredients_info: Optional[Dict[str, Tuple[str, int, int]]] = None) -> None:
         self.sentence = sentence
         self.temperature = temperature
         self.ingredients = ingredients
         self.time = time
-        self.method = method
         self.tools = tools
-        self.ingredients_info = self.find_all_ingredients_info(ingredients)   # dictionary of (ingredient, (info_str, num_index, i_index)) pairs
+        self._method = method
+        self._ingredients_info = ingredients_info
+        # kept until the ingredients info is computed
+        self._matcher = matcher
+        self._vague_actions: Optional[List[str]] = None
+    
+    @property
+    def method(self) -> MethodsType:
+        """(prime, verbs) of the sentence."""
+        if self._method is None:
+            self._method = to_method([self.sentence])[0]
+        return self._method
+    
+    @property
+    def ingredients_info(self) -> Dict[str, Tuple[str, int, int]]:
+        """Dictionary of (ingredient, (info_str, num_index, i_index)) pairs."""
+        if self._ingredients_info is None:
+            self._ingredients_info = self.find_all_ingredients_info(self.ingredients, self._matcher)
+            self._matcher = None
+        return self._ingredients_info
+    
+    @property
+    def vague_actions(self) -> List[str]:
+        """Parts of the sentence a user may ask "how to ..." about."""
+        if self._vague_actions is None:
+            self._vague_actions = answerVague(self.sentence)
+        return self._vague_actions
+    
+    def materialize(self) -> None:
+        """Computes the lazy fields now (the vague actions excepted, they are only used by questions)."""
+        self.method
+        self.ingredients_info
     
     def get_time_str(self) -> str:
         return time_to_str(self.time)
@@ -184,17 +209,13 @@ class Action:
         # requires: ingredient_name should be spelled correctly
         return self.ingredients_info.get(ingredient_name, ("", ""))[0]
 
-    def find_all_ingredients_info(self, ingredient_names: List[str]) -> Dict[str, Tuple[str, int, int]]:
+    def find_all_ingredients_info(self, ingredient_names: List[str],
+                                  matcher: Optional[IngredientMatcher] = None) -> Dict[str, Tuple[str, int, int]]:
         """Return a dictionary of (ingredient, (info_str, num_index, i_index)) pairs."""
-        imperative_sentence = imperative_to_normal(self.sentence)
-        doc = spacy_model(imperative_sentence)
+        doc = analyze(self.sentence).normal_doc(INDEX_PROFILE)
         
-        # try to find all the ingredients index in the sentence
-        ingredients_index_dict = {}
-        for i in ingredient_names:
-            i_index = find_ingredient_index(doc, i)
-            if i_index != -1:
-                ingredients_index_dict[i] = i_index
+        # find all the ingredients index in the sentence in one pass (end of the ingredient phrase, or one of its words)
+        ingredients_index_dict = matcher_for(ingredient_names, matcher).ingredient_indices(doc, ingredient_names)
         
         if len(ingredients_index_dict) == 0:
             return {}
@@ -225,36 +246,89 @@ class Action:
         
 
 class Step:
-    def __init__(self, sentences: List[str], ingredients_names: List[str]) -> None:
+    # the sentences are the ones of the actions, the ingredient names are the recipe's list (not copied)
+    __slots__ = ("actions", "tools", "ingredients_names", "_methods")
+    
+    def __init__(self, sentences: List[str], ingredients_names: List[str], matcher: Optional[IngredientMatcher] = None,
+                 previous_actions: Optional[Dict[str, "Action"]] = None, previous_names: Optional[List[str]] = None) -> None:
+        """
+        previous_actions: actions of the recipe before a transformation, by sentence, parsed with the ingredient
+        names previous_names. The method of an unchanged sentence is reused (if it was found) instead of being
+        analyzed again; its ingredients too if the ingredient names didn't change, and then the whole action if
+        its step context (temperature, tools) didn't change either.
+        """
         self.actions: List[Action] = []
+        matcher = matcher_for(ingredients_names, matcher)
+        previous_actions = previous_actions or {}
+        same_names = previous_names == ingredients_names
         
-        temperature_value = to_temperature(sentences)
-        ingredients_list, ingredients_mappings = to_ingredients(sentences, ingredients_names)
+        # times and temperatures of every sentence in one scan
+        readings_list = [scan_sentence(sentence) for sentence in sentences]
+        temperature_value = to_temperature(sentences, readings_list)
+        reused = previous_actions if same_names else {}
+        changed = [sentence for sentence in dict.fromkeys(sentences) if sentence not in reused]
+        changed_ingredients = dict(zip(changed, to_ingredients(changed, ingredients_names, matcher)[0])) if changed else {}
+        ingredients_list = [reused[sentence].ingredients if sentence in reused else changed_ingredients[sentence]
+                            for sentence in sentences]
         
-        time_list = to_time(sentences)
-        method_list = to_method(sentences)
+        time_list = to_time(sentences, readings_list)
+        # found on first use for the changed sentences (see Action.method)
+        method_list = [previous_actions[sentence]._method if sentence in previous_actions else None
+                       for sentence in sentences]
+        # a sentence without tools takes the ones of the previous sentence, so they are always found again (cheap)
         tools_list = to_tools(sentences)
 
         for i in range(len(sentences)):
-            self.actions.append(Action(sentences[i], temperature_value, ingredients_list[i], time_list[i],
-                                       method_list[i], tools_list[i]))
+            previous = reused.get(sentences[i])
+            if previous is not None and previous.temperature == temperature_value and previous.tools == tools_list[i]:
+                self.actions.append(previous)
+            else:
+                self.actions.append(Action(sentences[i], temperature_value, ingredients_list[i], time_list[i],
+                                           method_list[i], tools_list[i], matcher,
+                                           previous._ingredients_info if previous is not None else None))
         self.tools = collect_tools(tools_list)
-        self.methods = collect_methods(method_list)
-        self.sentences = sentences
+        self._methods: Optional[MethodsType] = None
         self.ingredients_names = ingredients_names
-
-def parse_original_ingredients(sentences_list: List[List[str]], ingredients_names: List[str]) -> List[Step]:
+    
+    @property
+    def sentences(self) -> List[str]:
+        return [action.sentence for action in self.actions]
+    
+    @property
+    def methods(self) -> MethodsType:
+        if self._methods is None:
+            self._methods = collect_methods([action.method for action in self.actions])
+        return self._methods
+
+def parse_original_ingredients(sentences_list: List[List[str]], ingredients_names: List[str],
+                               matcher: Optional[IngredientMatcher] = None) -> List[Step]:
     result = {}
+    matcher = matcher_for(ingredients_names, matcher)
     for sentences in sentences_list:
-        ingredients=to_ingredients(sentences, ingredients_names)[1]
+        ingredients=to_ingredients(sentences, ingredients_names, matcher)[1]
         for key, value in ingredients.items():
             result[key] = value
     return result 
 
-def parse_steps(sentences_list: List[List[str]], ingredients_names: List[str]) -> List[Step]:
+def parse_steps(sentences_list: List[List[str]], ingredients_names: List[str],
+                matcher: Optional[IngredientMatcher] = None, previous_steps: Optional[List[Step]] = None) -> List[Step]:
+    """
+    Parses every step; the ingredient matcher is compiled once for all of them if not given.
+
+    previous_steps: steps of the recipe before a transformation. Unchanged steps are reused as they are and
+    only the changed sentences of the other steps are analyzed again (see Step).
+    """
     steps = []
+    matcher = matcher_for(ingredients_names, matcher)
+    previous_steps = previous_steps or []
+    previous_names = previous_steps[0].ingredients_names if previous_steps else None
+    previous_by_sentences = {tuple(step.sentences): step for step in previous_steps
+                             if step.ingredients_names == ingredients_names}
+    previous_actions = {action.sentence: action for step in previous_steps for action in step.actions}
     for sentences in sentences_list:
-        step=Step(sentences, ingredients_names)
+        step = previous_by_sentences.get(tuple(sentences))
+        if step is None:
+            step=Step(sentences, ingredients_names, matcher, previous_actions, previous_names)
         steps.append(step)
     return steps    
 
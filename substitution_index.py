@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional, Tuple
+
+from fuzzywuzzy import fuzz
+
+try:
+    # what fuzz.ratio runs when python-Levenshtein is installed, without its wrappers
+    from Levenshtein import ratio as levenshtein_ratio
+except ImportError:
+    levenshtein_ratio = None
+
+# find_closest_match only substitutes when the ratio with the closest key is above this
+SIMILARITY_THRESHOLD = 70
+# number of substitution tables (e.g. merged ones) whose index is kept
+MAX_INDEXES = 32
+
+def intr(value: float) -> int:
+    """Rounding of fuzzywuzzy's scores."""
+    return int(round(value))
+
+def ratio(s1: str, s2: str) -> int:
+    """Same score as fuzz.ratio(s1, s2)."""
+    if levenshtein_ratio is None:
+        return fuzz.ratio(s1, s2)
+    if s1 == s2:
+        return 100
+    return intr(100 * levenshtein_ratio(s1, s2))
+
+class SubstitutionIndex:
+    """
+    Index of one substitution table (transformationDB) giving the same result as comparing the input with every
+    key by fuzz.ratio, taking the first best key, and substituting if its ratio is above the threshold.
+
+    Keys are blocked by length: fuzz.ratio is 2 * matching characters / total length, so it is at most
+    2 * shorter length / total length. Keys whose bound can't exceed the threshold are skipped without being
+    scored; they can't be the best key of a substitution. Results are memoized per input.
+    """
+    def __init__(self, table: Dict[str, str], threshold: int = SIMILARITY_THRESHOLD) -> None:
+        self.table = table
+        self.size = len(table)
+        self.threshold = threshold
+        self.entries: List[Tuple[str, str]] = list(table.items())
+        # key length -> positions of the keys in the table
+        self.by_length: Dict[int, List[int]] = {}
+        for position, (key, _) in enumerate(self.entries):
+            self.by_length.setdefault(len(key), []).append(position)
+        self.max_key_length = max(self.by_length, default=0)
+        self.memo: Dict[str, Optional[str]] = {}
+
+    def is_stale(self, table: Dict[str, str]) -> bool:
+        return table is not self.table or len(table) != self.size
+
+    def candidates(self, input_key: str) -> List[int]:
+        """Returns the positions of the keys that may score above the threshold, in table order."""
+        input_length = len(input_key)
+        positions = []
+        for length, length_positions in self.by_length.items():
+            total = length + input_length
+            if total > 0 and intr(200 * min(length, input_length) / total) > self.threshold:
+                positions.extend(length_positions)
+        return sorted(positions)
+
+    def lookup(self, input_key: str) -> Optional[str]:
+        """Returns the substitution of the closest key, or None if no key is similar enough."""
+        if input_key in self.memo:
+            return self.memo[input_key]
+        # exact key: only an identical string can round to 100 when both are shorter than 100 characters
+        if input_key in self.table and len(input_key) + self.max_key_length < 200:
+            result = self.table[input_key]
+        else:
+            best_position, best_score = -1, -1
+            for position in self.candidates(input_key):
+                score = ratio(self.entries[position][0], input_key)
+                if score > best_score:
+                    best_position, best_score = position, score
+            result = self.entries[best_position][1] if best_score > self.threshold else None
+        self.memo[input_key] = result
+        return result
+
+_indexes: Dict[int, SubstitutionIndex] = {}
+
+def get_substitution_index(table: Dict[str, str]) -> SubstitutionIndex:
+    """Returns the index of the table, built on first use (and again if the table changed size)."""
+    index = _indexes.get(id(table))
+    if index is None or index.is_stale(table):
+        if len(_indexes) >= MAX_INDEXES:
+            del _indexes[next(iter(_indexes))]
+        index = SubstitutionIndex(table)
+        _indexes[id(table)] = index
+    return index
@@ -0,0 +1,50 @@
+import extraction
+from extraction import extract_recipe_parts
+
+JSONLD = b"""<script type="application/ld+json">{"@context": "https://schema.org", "@type": "Recipe", "name": "Omelet",
+"recipeIngredient": ["3 large eggs", "1 tablespoon butter"],
+"recipeInstructions": [{"@type": "HowToStep", "text": "Beat the eggs."}, {"@type": "HowToStep", "text": "Melt the butter in a pan."}]}
+</script>"""
+
+SPANS = b"""<div id="mntl-structured-ingredients_1-0"><ul>
+<li><p><span data-ingredient-quantity="true">3</span> <span data-ingredient-unit="true">large</span> <span data-ingredient-name="true">eggs</span></p></li>
+<li><p><span data-ingredient-quantity="true">1</span> <span data-ingredient-unit="true">tablespoon</span> <span data-ingredient-name="true">butter</span></p></li>
+</ul></div>
+<ol id="mntl-sc-block_2-0"><li><p>Beat the eggs.</p></li><li><p>Melt the butter in a pan.</p></li></ol>"""
+
+PAGE = b"<html><head><title>Omelet</title>" + JSONLD + b"</head><body>" + SPANS + b"</body></html>"
+JSONLD_PAGE = b"<html><head><title>Omelet</title>" + JSONLD + b"</head><body></body></html>"
+
+def fields(parts):
+    title, raw_ingredients, step_texts = parts
+    return title, [(raw.quantity, raw.unit, raw.name) for raw in raw_ingredients], step_texts
+
+def test_spans_preferred():
+    # lxml is optional
+    backends = ["html.parser"] if extraction.lxml is None else ["lxml", "html.parser"]
+    for backend in backends:
+        parts = fields(extract_recipe_parts(PAGE, backend=backend))
+        # the json-ld of the page doesn't replace the spans
+        assert parts == fields(extract_recipe_parts(PAGE, backend=backend, use_jsonld=False))
+        assert parts[1][0] == ("3", "large", "eggs")
+        assert parts[2] == ["Beat the eggs.", "Melt the butter in a pan."]
+
+def test_jsonld_fallback():
+    title, raw_ingredients, step_texts = extract_recipe_parts(JSONLD_PAGE)
+    assert title == "Omelet"
+    assert [raw.text for raw in raw_ingredients] == ["3 large eggs", "1 tablespoon butter"]
+    assert step_texts == ["Beat the eggs.", "Melt the butter in a pan."]
+    try:
+        extract_recipe_parts(JSONLD_PAGE, use_jsonld=False)
+    except Exception as e:
+        assert str(e) == "No ingredients found."
+    else:
+        assert False, "a page without spans should fail without json-ld"
+
+def main():
+    test_spans_preferred()
+    test_jsonld_fallback()
+    print("extraction: ok")
+
+if __name__ == "__main__":
+    main()
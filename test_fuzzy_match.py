@@ -0,0 +1,31 @@
+import random
+
+from fuzzywuzzy import process
+
+from fuzzy_match import extract_one_batch
+
+INGREDIENTS = ["white sugar", "all-purpose flour", "salt", "milk", "egg yolks", "butter", "vanilla extract",
+               "bananas", "baked pastry shell", "heavy cream", "ground cinnamon", "brown sugar", "olive oil"]
+
+def extract_one(query: str) -> tuple:
+    """The per-token matching that to_ingredients used to do."""
+    best = process.extractOne(query, INGREDIENTS)
+    return (best[0], best[1]) if best is not None and best[1] >= 80 else None
+
+def test_same_as_extract_one():
+    random.seed(0)
+    words = [word for ingredient in INGREDIENTS for word in ingredient.split()]
+    queries = words + ["yolk", "sugars", "cinamon", "bannana", "saucepan", "stir", "2-inch", "350", "&", ""]
+    queries += ["".join(random.choice("abcdefghijklmnopqrstuvwxyz -") for _ in range(random.randint(1, 10))) for _ in range(500)]
+    assert extract_one_batch(queries, INGREDIENTS) == [extract_one(query) for query in queries]
+
+def test_no_ingredients():
+    assert extract_one_batch(["sugar", "milk"], []) == [None, None]
+
+def main():
+    test_same_as_extract_one()
+    test_no_ingredients()
+    print("fuzzy match: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+import ingest
+from ingest import load_checkpoint
+
+class InProcessPool:
+    """Stands for multiprocessing.Pool: runs the tasks in this process, without loading any model."""
+    def __init__(self, workers, initializer=None, initargs=()) -> None:
+        pass
+
+    def __enter__(self) -> "InProcessPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def imap_unordered(self, function, tasks, chunksize=1):
+        return map(function, tasks)
+
+def fake_parse_source(task):
+    index, source = task
+    if source.startswith("bad"):
+        return {"index": index, "source": source, "error": "ValueError: no steps"}
+    return {"index": index, "source": source, "recipe": {"recipe_name": source}}
+
+def write_job(directory: str, sources, lines):
+    input_path = os.path.join(directory, "sources.txt")
+    output_path = os.path.join(directory, "recipes.jsonl")
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(sources) + "\n")
+    with open(output_path, "wb") as f:
+        f.write(b"".join(lines))
+    return input_path, output_path
+
+def record_line(record) -> bytes:
+    return (json.dumps(record) + "\n").encode("utf-8")
+
+PARTIAL_LINES = [
+    record_line({"index": 0, "source": "a.html", "recipe": {"recipe_name": "a"}}),
+    record_line({"index": 1, "source": "bad.html", "error": "ValueError: no steps"}),
+    # cut off by a killed job
+    b'{"index": 2, "source": "c.html", "reci',
+]
+SOURCES = ["a.html", "bad.html", "c.html", "d.html"]
+
+def test_load_checkpoint():
+    with tempfile.TemporaryDirectory() as directory:
+        _, output_path = write_job(directory, SOURCES, PARTIAL_LINES)
+        assert load_checkpoint(output_path) == {"a.html", "bad.html"}
+        # the cut-off line is gone
+        assert os.path.getsize(output_path) == len(PARTIAL_LINES[0]) + len(PARTIAL_LINES[1])
+        assert load_checkpoint(output_path, retry_errors=True) == {"a.html"}
+        assert load_checkpoint(os.path.join(directory, "missing.jsonl")) == set()
+
+def run(input_path: str, output_path: str, retry_errors: bool):
+    with mock.patch.object(ingest.multiprocessing, "Pool", InProcessPool), \
+            mock.patch.object(ingest, "parse_source", mock.Mock(side_effect=fake_parse_source)) as parse_source:
+        counts = ingest.ingest(input_path, output_path, workers=1, retry_errors=retry_errors)
+    return counts, [call.args[0][1] for call in parse_source.call_args_list]
+
+def test_resume():
+    with tempfile.TemporaryDirectory() as directory:
+        input_path, output_path = write_job(directory, SOURCES, PARTIAL_LINES)
+        counts, parsed = run(input_path, output_path, retry_errors=False)
+        assert parsed == ["c.html", "d.html"]
+        assert counts == {"total": 4, "skipped": 2, "parsed": 2, "failed": 0}
+        with open(output_path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        assert [record["source"] for record in records] == ["a.html", "bad.html", "c.html", "d.html"]
+
+        counts, parsed = run(input_path, output_path, retry_errors=False)
+        assert parsed == [] and counts["skipped"] == 4
+        counts, parsed = run(input_path, output_path, retry_errors=True)
+        assert parsed == ["bad.html"]
+        assert counts == {"total": 4, "skipped": 3, "parsed": 0, "failed": 1}
+
+def main():
+    test_load_checkpoint()
+    test_resume()
+    print("ingest: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from unittest import mock
+
+import spacy
+from spacy.tokens import Doc
+
+import ingredient_matcher
+from ingredient_matcher import IngredientMatcher, singular
+
+nlp = spacy.blank("en")
+
+def blank_pipeline(model_name, texts, profile):
+    """Stands for model_registry.pipe_pipeline: tokens without tags or lemmas."""
+    return [nlp(text) for text in texts]
+
+def make_matcher(names) -> IngredientMatcher:
+    with mock.patch.object(ingredient_matcher, "pipe_pipeline", blank_pipeline):
+        return IngredientMatcher(names)
+
+def make_doc(text: str, nouns=(), lemmas=None) -> Doc:
+    """A sentence doc of the whitespace-separated words, with the words in nouns tagged NOUN."""
+    words = text.split()
+    pos = ["NOUN" if word in nouns else "VERB" for word in words]
+    return Doc(nlp.vocab, words=words, pos=pos, lemmas=lemmas)
+
+def test_multi_word_names():
+    matcher = make_matcher(["brown sugar", "sugar", "extra virgin olive oil"])
+    doc = make_doc("mix the brown sugar with sugar and extra virgin olive oil")
+    assert matcher.find_mentions(doc) == [(2, 4, "brown sugar"), (5, 6, "sugar"), (7, 11, "extra virgin olive oil")]
+    assert matcher.ingredient_indices(doc, ["sugar", "brown sugar"]) == {"sugar": 5, "brown sugar": 3}
+
+def test_plural_mentions():
+    matcher = make_matcher(["egg", "tomatoes", "cherry"])
+    doc = make_doc("beat the eggs , add the tomato and the cherries")
+    assert matcher.find_mentions(doc) == [(2, 3, "egg"), (6, 7, "tomatoes"), (9, 10, "cherry")]
+    # the lemma of a tagged token is matched too
+    leaves = make_matcher(["bay leaf"])
+    doc = make_doc("add the bay leaves", lemmas=["add", "the", "bay", "leaf"])
+    assert leaves.find_mentions(doc) == [(2, 4, "bay leaf")]
+    assert [singular(word) for word in ("eggs", "cherries", "dishes", "glass", "couscous")] == \
+           ["egg", "cherry", "dish", "glass", "couscous"]
+
+def test_partial_mentions():
+    matcher = make_matcher(["cake flour", "unsalted butter"])
+    doc = make_doc("sift the flour and melt the butter", nouns=["flour", "butter"])
+    assert matcher.find_mentions(doc) == []
+    assert matcher.ingredient_indices(doc, ["unsalted butter", "cake flour"]) == {"unsalted butter": 6, "cake flour": 2}
+    # only NOUN tokens are partial mentions
+    doc = make_doc("sift the flour and butter the pan")
+    assert matcher.ingredient_indices(doc, ["unsalted butter", "cake flour"]) == {}
+
+def test_overlapping_names():
+    matcher = make_matcher(["olive oil", "oil", "olive"])
+    doc = make_doc("heat the olive oil then the oil with an olive")
+    # the longest name is taken at each token, the mentions don't overlap
+    assert matcher.find_mentions(doc) == [(2, 4, "olive oil"), (6, 7, "oil"), (9, 10, "olive")]
+    # the first name of the same phrase wins
+    matcher = make_matcher(["egg", "eggs"])
+    assert matcher.find_mentions(make_doc("crack the eggs")) == [(2, 3, "egg")]
+
+def main():
+    test_multi_word_names()
+    test_plural_mentions()
+    test_partial_mentions()
+    test_overlapping_names()
+    print("ingredient matcher: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import random
+import re
+import string
+import time
+
+from keyword_matcher import KeywordMatcher, trie_pattern
+
+TOOLS = ["pan", "saucepan", "roasting pan", "baking sheet", "sheet", "bake", "pastry brush"]
+METHODS = ["stir", "stir-fry", "fry", "bake", "boil"]
+
+def test_longest_match():
+    matcher = KeywordMatcher(TOOLS)
+    assert matcher.find("heat the saucepan") == ["saucepan"]
+    assert matcher.find("in a roasting pan") == ["roasting pan"]
+    assert matcher.find("put it on a baking sheet and bake") == ["baking sheet", "bake"]
+    # vocabulary order, each keyword once
+    assert matcher.find("a saucepan, a pan and another pan") == ["pan", "saucepan"]
+
+def test_inner_keywords():
+    matcher = KeywordMatcher(METHODS, longest_match=False)
+    assert matcher.find("stir-fry the beef") == ["stir", "stir-fry", "fry"]
+    assert matcher.find("bake then fry") == ["fry", "bake"]
+    assert KeywordMatcher(METHODS).find("stir-fry the beef") == ["stir-fry"]
+
+def test_word_boundaries():
+    matcher = KeywordMatcher(TOOLS)
+    assert matcher.find("don't panic") == []
+    assert matcher.find("spanish rice") == []
+    assert matcher.find("two pans") == []
+    methods = KeywordMatcher(METHODS, longest_match=False)
+    # a keyword followed by "ing" is matched too
+    assert methods.find("boiling water") == ["boil"]
+    assert methods.find("boiled water") == []
+
+def test_same_as_one_search_per_keyword():
+    matcher = KeywordMatcher(METHODS + TOOLS, longest_match=False)
+    keywords = list(dict.fromkeys(METHODS + TOOLS))
+    for text in ["stir-fry in a saucepan", "boiling the pastry brush", "a baking sheet or a roasting pan", "fryer"]:
+        expected = [keyword for keyword in keywords if re.search(r"\b" + re.escape(keyword) + r"(|ing)\b", text)]
+        assert matcher.find(text) == expected, text
+
+def test_inner_same_as_one_search_per_pair():
+    keywords = METHODS + TOOLS + ["baking", "pan-fry", "frying pan", "stirring spoon", "_pan", "pan_"]
+    matcher = KeywordMatcher(keywords, longest_match=False)
+    for keyword in matcher.keywords:
+        expected = [other for other in matcher.keywords if other != keyword
+                    and re.search(r"\b" + re.escape(other) + r"(|ing)\b", keyword)]
+        assert matcher.inner[keyword] == expected, keyword
+
+def test_large_vocabulary():
+    rng = random.Random(0)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8))) for _ in range(3000)]
+    keywords = [" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(3000)] + words
+    start = time.perf_counter()
+    matcher = KeywordMatcher(keywords, longest_match=False)
+    assert time.perf_counter() - start < 1.0
+    assert words[0] in matcher.find(f"the {words[0]} and the {words[1]}")
+
+def test_trie_pattern():
+    assert trie_pattern(["pan", "pastry brush"]) == "pa(?:n|stry\\ brush)"
+    assert re.fullmatch(trie_pattern(["pan", "pans"]), "pan")
+
+def main():
+    test_longest_match()
+    test_inner_keywords()
+    test_word_boundaries()
+    test_same_as_one_search_per_keyword()
+    test_inner_same_as_one_search_per_pair()
+    test_large_vocabulary()
+    test_trie_pattern()
+    print("keyword matcher: ok")
+
+if __name__ == "__main__":
+    main()
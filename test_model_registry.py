@@ -0,0 +1,40 @@
+from unittest import mock
+
+import model_registry
+from model_registry import get_model, run_pipeline, pipe_pipeline, disabled_components, PROFILES, SMALL_MODEL, LARGE_MODEL
+from test_sentence_analysis import fake_models, fake_load, calls
+
+# components run by each profile, in pipeline order
+EXPECTED_COMPONENTS = {
+    "tokens-only": [],
+    "tagger": ["tok2vec", "tagger", "attribute_ruler", "lemmatizer"],
+    "parser": ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer"],
+    "full": ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"],
+}
+
+def test_profiles():
+    with fake_models():
+        nlp = get_model(LARGE_MODEL)
+        for profile, components in EXPECTED_COMPONENTS.items():
+            assert run_pipeline(LARGE_MODEL, "You mix the flour.", profile).user_data.get("components", []) == components, profile
+            docs = list(pipe_pipeline(LARGE_MODEL, ["You mix the flour.", "You bake it."], profile, batch_size=1))
+            assert [doc.user_data.get("components", []) for doc in docs] == [components, components], profile
+            assert disabled_components(nlp, profile) == [name for name in nlp.pipe_names if name not in components]
+        assert set(PROFILES) == set(EXPECTED_COMPONENTS)
+
+def test_loaded_once():
+    with fake_models():
+        with mock.patch.object(model_registry.spacy, "load", mock.Mock(side_effect=fake_load)) as load:
+            assert get_model(LARGE_MODEL) is get_model(LARGE_MODEL)
+            get_model(SMALL_MODEL)
+        assert [call.args[0] for call in load.call_args_list] == [LARGE_MODEL, SMALL_MODEL]
+        assert set(model_registry.get_model_stats()) == {LARGE_MODEL, SMALL_MODEL}
+        assert sum(calls.values()) == 0
+
+def main():
+    test_profiles()
+    test_loaded_once()
+    print("model registry: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from unittest import mock
+
+from quantity_transformation import modify_quantity_action
+from sentence_analysis import analyze
+from spacy_helper import INDEX_PROFILE
+from step import Action
+from test_sentence_analysis import fake_models, calls
+
+def ingredients_info(action, ingredient_names, matcher=None):
+    """Stands for Action.find_all_ingredients_info: reads the parser doc of the sentence."""
+    analyze(action.sentence).normal_doc(INDEX_PROFILE)
+    return {"flour": ("2 cups flour", 1, 3)}
+
+def test_large_model_run_once():
+    with fake_models(), mock.patch.object(Action, "find_all_ingredients_info", ingredients_info):
+        action = Action("Add 2 cups flour.", None, ["flour"], None, None, [], None)
+        modify_quantity_action(action, 2.0)
+        # the tagger doc is the parser doc of the ingredients info
+        assert calls["parser"] == 1 and calls["tagger"] == 1
+
+def main():
+    test_large_model_run_once()
+    print("quantity transformation: ok")
+
+if __name__ == "__main__":
+    main()
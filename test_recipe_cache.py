@@ -0,0 +1,159 @@
+import json
+import os
+import tempfile
+import time
+from unittest import mock
+
+import recipe
+import recipe_cache
+import step
+from ingredient import RawIngredient
+from recipe import Recipe
+from recipe_cache import RecipeCache, content_key, load_recipe
+from step import Action, Step
+
+class StubRecipe:
+    """Stands for a parsed Recipe, only pickled and compared."""
+    def __init__(self, recipe_name: str, size: int = 0) -> None:
+        self.recipe_name = recipe_name
+        self.padding = "x" * size
+
+RAW_INGREDIENTS = [RawIngredient("2 cups flour", "2", "cups", "flour")]
+RAW_STEPS = ["Mix the flour."]
+
+def make_cache(**kwargs) -> RecipeCache:
+    return RecipeCache(tempfile.mkdtemp(), **kwargs)
+
+def test_put_get():
+    cache = make_cache()
+    cache.put("https://a", "key-a", StubRecipe("a"))
+    assert cache.get("key-a").recipe_name == "a"
+    assert cache.get_by_url("https://a").recipe_name == "a"
+    assert cache.get("missing") is None and cache.get_by_url("https://b") is None
+    # the index is saved: a new cache on the same directory finds the entry
+    assert RecipeCache(cache.cache_dir).get_by_url("https://a").recipe_name == "a"
+
+def test_ttl_expiry():
+    cache = make_cache(ttl_seconds=60)
+    cache.put("https://a", "key-a", StubRecipe("a"))
+    cache.index["urls"]["https://a"]["fetched"] -= 120
+    # the url must be downloaded again, the content is still valid
+    assert cache.get_by_url("https://a") is None
+    assert cache.get("key-a") is not None
+    cache.index["entries"]["key-a"]["created"] -= 120
+    assert cache.get("key-a") is None
+    assert "key-a" not in cache.index["entries"]
+    assert not os.path.exists(cache.entry_path("key-a"))
+
+def test_lru_eviction():
+    cache = make_cache()
+    for name in ("a", "b", "c"):
+        cache.put(f"https://{name}", f"key-{name}", StubRecipe(name, 1000))
+    size = cache.index["entries"]["key-a"]["size"]
+    now = time.time()
+    for i, key in enumerate(("key-b", "key-a", "key-c")):
+        cache.index["entries"][key]["last_used"] = now - 10 + i
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert sorted(cache.index["entries"]) == ["key-a", "key-c"]
+    assert not os.path.exists(cache.entry_path("key-b"))
+    assert "https://b" not in cache.index["urls"]
+
+def test_content_key():
+    key = content_key("https://a", RAW_INGREDIENTS, RAW_STEPS)
+    assert key == content_key("https://a", RAW_INGREDIENTS, [" Mix the flour. "])
+    assert key != content_key("https://b", RAW_INGREDIENTS, RAW_STEPS)
+    assert key != content_key("https://a", RAW_INGREDIENTS, ["Mix the sugar."])
+    with mock.patch.object(recipe_cache, "RECIPE_CACHE_VERSION", recipe_cache.RECIPE_CACHE_VERSION + 1):
+        assert key != content_key("https://a", RAW_INGREDIENTS, RAW_STEPS)
+
+def test_outdated_index():
+    cache = make_cache()
+    cache.put("https://a", "key-a", StubRecipe("a"))
+    with open(cache.index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    index["version"] = recipe_cache.RECIPE_CACHE_VERSION - 1
+    with open(cache.index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    assert RecipeCache(cache.cache_dir).get_by_url("https://a") is None
+
+def test_corrupt_entry():
+    cache = make_cache()
+    cache.put("https://a", "key-a", StubRecipe("a"))
+    with open(cache.entry_path("key-a"), "wb") as f:
+        f.write(b"not a pickle")
+    assert cache.get("key-a") is None
+    assert "key-a" not in cache.index["entries"] and "https://a" not in cache.index["urls"]
+    with open(cache.index_path, "wb") as f:
+        f.write(b"{not json")
+    assert RecipeCache(cache.cache_dir).index["entries"] == {}
+
+def make_recipe() -> Recipe:
+    """A Recipe as Recipe.parse leaves it, with the fields computed on first use still missing."""
+    sentences_list = [["Mix the flour.", "Bake for 30 minutes."]]
+    new_recipe = Recipe.__new__(Recipe)
+    new_recipe.recipe_name = "Bread"
+    new_recipe.batch_size = 1
+    new_recipe.sentences_list = sentences_list
+    new_recipe.ingredients = []
+    new_recipe.ingredients_names = ["flour"]
+    new_recipe.ingredient_matcher = None
+    new_step = Step.__new__(Step)
+    new_step.actions = [Action(sentence, None, ["flour"], None, None, [], None) for sentence in sentences_list[0]]
+    new_step.tools = []
+    new_step.ingredients_names = new_recipe.ingredients_names
+    new_step._methods = None
+    new_recipe.steps = [new_step]
+    new_recipe.tools = []
+    new_recipe._methods = None
+    new_recipe.num_actions = 2
+    new_recipe.action_idx_to_idx_tuple = new_recipe.make_idx_array()
+    new_recipe.modification = ""
+    return new_recipe
+
+def find_method(sentences):
+    return [[sentence.split()[0].lower()] for sentence in sentences], [[] for _ in sentences]
+
+def fail(*args, **kwargs):
+    raise AssertionError("the cached recipe was parsed again")
+
+def test_load_cached_recipe_without_parsing():
+    cache = make_cache()
+    parts = ("Bread", RAW_INGREDIENTS, ["Mix the flour. Bake for 30 minutes."])
+    with mock.patch.object(recipe_cache, "get_recipe_parts_from_url", return_value=parts), \
+            mock.patch.object(Recipe, "from_raw", return_value=make_recipe()), \
+            mock.patch.object(recipe, "analyze_all"), \
+            mock.patch.object(step, "findMethod", find_method), \
+            mock.patch.object(Action, "find_all_ingredients_info", return_value={"flour": ("", 1, 2)}):
+        with mock.patch.object(recipe_cache, "preload_models") as preload_models:
+            expected = load_recipe("https://bread", cache, preload=True).to_dict()
+        preload_models.assert_called_once_with()
+
+    # no spaCy analysis or action function may run on a cache hit, by url or by content
+    with mock.patch.object(recipe, "analyze_all", fail), mock.patch.object(step, "analyze", fail), \
+            mock.patch.object(step, "findMethod", fail), mock.patch.object(step, "findTool", fail), \
+            mock.patch.object(Recipe, "from_raw", fail), mock.patch.object(recipe_cache, "preload_models", fail):
+        with mock.patch.object(recipe_cache, "get_recipe_parts_from_url", fail):
+            cached = load_recipe("https://bread", RecipeCache(cache.cache_dir), preload=True)
+        assert cached.to_dict() == expected
+        assert cached.get_action(1).method == (("bake",), ())
+        assert cached.get_action(0).ingredients_info == {"flour": ("", 1, 2)}
+
+        # the url is downloaded again, its content didn't change
+        cache = RecipeCache(cache.cache_dir, ttl_seconds=60)
+        cache.index["urls"]["https://bread"]["fetched"] -= 120
+        with mock.patch.object(recipe_cache, "get_recipe_parts_from_url", return_value=parts):
+            assert load_recipe("https://bread", cache).to_dict() == expected
+
+def main():
+    test_put_get()
+    test_ttl_expiry()
+    test_lru_eviction()
+    test_content_key()
+    test_outdated_index()
+    test_corrupt_entry()
+    test_load_cached_recipe_without_parsing()
+    print("recipe cache: ok")
+
+if __name__ == "__main__":
+    main()
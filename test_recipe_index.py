@@ -0,0 +1,81 @@
+import pytest
+
+from recipe_index import RecipeIndex, canonical
+
+def action(ingredients=(), tools=(), prime=(), verbs=()):
+    return {"sentence": "", "temperature": None, "ingredients": list(ingredients), "time": None, "prime": list(prime),
+            "verbs": list(verbs), "tools": list(tools), "ingredients_info": {}}
+
+def recipe(name, ingredients, steps):
+    return {"recipe_name": name, "ingredients": [{"name": ingredient} for ingredient in ingredients], "steps": steps}
+
+SAUCE = recipe("sauce", ["butter", "flour", "Whole Milk"], [
+    [action(["butter"], ["saucepan"], ["melt"]), action(["flour"], [], [], ["whisk"])],
+    [action(["whole milk"], ["saucepan"], ["simmer"], ["stir"])],
+])
+CAKE = recipe("cake", ["butter", "eggs", "sugar"], [
+    [action(["butter", "sugar"], ["bowl"], [], ["beat"]), action(["eggs"], [], [], ["add"])],
+    [action([], ["oven"], ["bake"])],
+])
+SOUP = recipe("soup", ["onions", "carrots"], [[action(["onions", "carrots"], ["saucepan"], ["simmer"])]])
+
+def make_index():
+    index = RecipeIndex()
+    assert index.add_all([SAUCE, CAKE, SOUP]) == [0, 1, 2]
+    return index
+
+def test_canonical():
+    assert canonical("Egg Yolks") == "egg yolk"
+    assert canonical("saucepans") == "saucepan"
+    assert canonical("eggs") == canonical("egg")
+
+def test_and_queries():
+    index = make_index()
+    assert index.query("saucepan AND simmer AND butter") == [0]
+    assert index.query("saucepan AND simmer") == [0, 2]
+    assert index.query("butter") == [0, 1]
+    assert index.query("egg") == [1]
+    assert index.query("whole milk AND stir") == [0]
+    assert index.query("saucepan AND oven") == []
+    assert index.query("truffle") == []
+
+def test_boolean_queries():
+    index = make_index()
+    assert index.query("bake OR simmer") == [0, 1, 2]
+    assert index.query("saucepan AND NOT butter") == [2]
+    assert index.query("NOT saucepan") == [1]
+    assert index.query("tool:saucepan") == [0, 2]
+    assert index.query("method:butter") == []
+
+def test_action_queries():
+    index = make_index()
+    assert index.query_actions("saucepan AND simmer") == [(0, 2), (2, 0)]
+    assert index.query_actions("butter AND sugar") == [(1, 0)]
+    # in the same recipe but not in the same action
+    assert index.query_actions("saucepan AND butter AND simmer") == []
+
+def test_delete_and_replace():
+    index = make_index()
+    index.delete(0)
+    assert 0 not in index and len(index) == 2
+    assert index.query("butter") == [1]
+    assert index.query_actions("saucepan") == [(2, 0)]
+    assert ("tool", "saucepan") in index.recipe_postings
+    index.delete(2)
+    assert ("tool", "saucepan") not in index.recipe_postings
+    index.add(1, SOUP)
+    assert index.query("butter") == []
+    assert index.query("onion") == [1]
+    with pytest.raises(KeyError):
+        index.delete(0)
+
+def main():
+    test_canonical()
+    test_and_queries()
+    test_boolean_queries()
+    test_action_queries()
+    test_delete_and_replace()
+    print("recipe index: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from recipe_table import RecipeTable, RecipeTableBuilder
+
+def action(time=None, temperature=None, tools=(), prime=(), verbs=()):
+    return {"sentence": "", "temperature": temperature, "ingredients": [], "time": time, "prime": list(prime),
+            "verbs": list(verbs), "tools": list(tools), "ingredients_info": {}}
+
+QUICK = {"recipe_name": "quick", "steps": [
+    [action(time=["10", "15", "minutes"], tools=["saucepan"], prime=["simmer"], verbs=["stir"])],
+    [action(temperature=["medium", "heat"], prime=["simmer", "fry"]), action(time=["2", "2", "minutes"], prime=["fry"])],
+]}
+SLOW = {"recipe_name": "slow", "steps": [
+    [action(temperature=["350", "F"], time=["1", "1", "hours"], tools=["oven", "baking dish"], prime=["bake"])],
+    [action(tools=["oven"], prime=["bake"], verbs=["cool"])],
+]}
+UNTIMED = {"recipe_name": "untimed", "steps": [
+    [action(tools=["bowl"], prime=["whisk"]), action(prime=["chill"])],
+]}
+
+def test_columns():
+    table = RecipeTable.from_recipes([QUICK, SLOW])
+    assert table.num_recipes == 2 and table.num_actions == 5
+    assert list(table.columns["recipe_id"]) == [0, 0, 0, 1, 1]
+    assert list(table.columns["step_idx"]) == [0, 1, 1, 0, 1]
+    assert list(table.columns["action_idx"]) == [0, 0, 1, 0, 0]
+    assert table.columns["time_low"][0] == 600 and table.columns["time_high"][0] == 900
+    assert np.isnan(table.columns["temperature"][1]) and table.columns["temperature"][3] == 350
+    assert list(table.recipe_seconds()) == [1020, 3600]
+
+def test_counts():
+    table = RecipeTable.from_recipes([QUICK, SLOW])
+    assert table.counts("method") == {"simmer": 2, "fry": 2, "bake": 2}
+    assert table.counts("method", per_recipe=True) == {"simmer": 1, "fry": 1, "bake": 1}
+    assert table.counts("tool", per_recipe=True) == {"saucepan": 1, "oven": 1, "baking dish": 1}
+    assert table.method_counts_under(30 * 60) == {"simmer": 1, "fry": 1}
+    assert table.method_counts_under(30 * 60, per_recipe=False) == {"simmer": 2, "fry": 2}
+
+def test_untimed_recipe():
+    table = RecipeTable.from_recipes([QUICK, UNTIMED, SLOW])
+    seconds = table.recipe_seconds()
+    assert seconds[0] == 1020 and np.isnan(seconds[1]) and seconds[2] == 3600
+    # an unknown time is neither under nor over a bound
+    assert list(table.recipe_mask(max_seconds=30 * 60)) == [True, False, False]
+    assert list(table.recipe_mask(min_seconds=30 * 60)) == [False, False, True]
+    assert list(table.recipe_mask()) == [True, True, True]
+    assert table.method_counts_under(30 * 60) == {"simmer": 1, "fry": 1}
+
+def test_save_load():
+    with tempfile.TemporaryDirectory() as directory:
+        records = os.path.join(directory, "recipes.jsonl")
+        with open(records, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"index": 0, "source": "a.html", "recipe": QUICK}) + "\n")
+            f.write(json.dumps({"index": 1, "source": "b.html", "error": "ValueError: no steps"}) + "\n")
+            f.write(json.dumps({"index": 2, "source": "c.html", "recipe": SLOW}) + "\n")
+        builder = RecipeTableBuilder()
+        assert builder.add_jsonl(records) == 2
+        builder.build().save(os.path.join(directory, "table"))
+        table = RecipeTable.load(os.path.join(directory, "table"))
+        assert isinstance(table.columns["recipe_id"], np.memmap)
+        assert table.sources == ["a.html", "c.html"]
+        assert table.method_counts_under(30 * 60) == {"simmer": 1, "fry": 1}
+        del table
+
+def main():
+    test_columns()
+    test_counts()
+    test_untimed_recipe()
+    test_save_load()
+    print("recipe table: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from collections import Counter
+from contextlib import contextmanager
+from unittest import mock
+
+import spacy
+from spacy.language import Language
+
+import model_registry
+import sentence_analysis
+from model_registry import LARGE_MODEL, profile_covers
+from sentence_analysis import analyze, analyze_all, clear_analysis_cache, ANALYSIS_CACHE_SIZE
+
+# components of the spacy models, in pipeline order
+COMPONENTS = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+# number of docs each stand-in component processed
+calls = Counter()
+
+def counting_component(name: str):
+    def component(doc):
+        calls[name] += 1
+        doc.user_data.setdefault("components", []).append(name)
+        return doc
+    return component
+
+for component_name in COMPONENTS:
+    Language.component(f"counting_{component_name}", func=counting_component(component_name))
+
+def fake_load(name: str) -> Language:
+    """Stands for spacy.load: a blank english pipeline whose components only count the docs."""
+    nlp = spacy.blank("en")
+    for name in COMPONENTS:
+        nlp.add_pipe(f"counting_{name}", name=name)
+    return nlp
+
+@contextmanager
+def fake_models():
+    """Loads the stand-in models in a clean registry and analysis cache, and resets the counts."""
+    clear_analysis_cache()
+    calls.clear()
+    with mock.patch.object(model_registry.spacy, "load", fake_load), \
+            mock.patch.dict(model_registry._models, clear=True), \
+            mock.patch.dict(model_registry._model_stats, clear=True), \
+            mock.patch.dict(model_registry._hyphen_tokenizers, clear=True):
+        yield
+    clear_analysis_cache()
+
+def test_parsed_once():
+    with fake_models():
+        analysis = analyze("Mix the flour.")
+        assert analyze(" Mix the flour. ") is analysis
+        doc = analysis.normal_doc("parser")
+        assert doc.text == "You mix the flour."
+        # the clause view has the same text here: it shares the doc
+        assert analysis.clause_doc("parser") is doc and analyze("Mix the flour.").normal_doc() is doc
+        assert calls["parser"] == 1 and calls["ner"] == 0
+
+def test_profile_upgrade():
+    with fake_models():
+        analysis = analyze("Mix the flour.")
+        tagged = analysis.normal_doc("tagger")
+        assert tagged.user_data["components"] == ["tok2vec", "tagger", "attribute_ruler", "lemmatizer"]
+        # an extractor needing more replaces the cached doc
+        parsed = analysis.normal_doc("parser")
+        assert parsed is not tagged and "parser" in parsed.user_data["components"]
+        # and a cheaper profile reads the better doc
+        assert analysis.normal_doc("tagger") is parsed and analysis.normal_doc("tokens-only") is parsed
+        assert calls["tagger"] == 2 and calls["parser"] == 1
+
+def test_tokens():
+    with fake_models():
+        analysis = analyze("Cut into 2-inch pieces.")
+        # lowercased, "-" split after a number, no suffix rules
+        assert [token.text for token in analysis.tokens] == ["cut", "into", "2", "-", "inch", "pieces."]
+        assert analysis.tokens is analysis.tokens
+        assert sum(calls.values()) == 0
+
+def test_lru_bound():
+    with fake_models():
+        first = analyze("sentence 0")
+        for i in range(1, ANALYSIS_CACHE_SIZE + 1):
+            analyze(f"sentence {i}")
+        assert sentence_analysis._analyze_normalized.cache_info().currsize == ANALYSIS_CACHE_SIZE
+        assert analyze(f"sentence {ANALYSIS_CACHE_SIZE}") is analyze(f"sentence {ANALYSIS_CACHE_SIZE}")
+        # the least recently used sentence was dropped
+        assert analyze("sentence 0") is not first
+
+def test_analyze_all_one_pipe():
+    with fake_models():
+        analyze("Mix the flour.").normal_doc("parser")
+        sentences_list = [["Mix the flour.", "Bake for 30 minutes."], ["Meanwhile, melt the butter.", "Bake for 30 minutes."]]
+        with mock.patch.object(sentence_analysis, "pipe_pipeline", wraps=model_registry.pipe_pipeline) as pipe:
+            analyses = analyze_all(sentences_list, batch_size=3)
+        # one call, only the texts without a parser doc, each once
+        pipe.assert_called_once_with(LARGE_MODEL, ["You bake for 30 minutes.", "You meanwhile, melt the butter.",
+                                                   "You melt the butter."], "parser", 3)
+        assert calls["parser"] == 4
+        assert [analysis.sentence for analysis in analyses] == [sentence for sentences in sentences_list for sentence in sentences]
+        assert analyses[1] is analyses[3]
+        # the extractors read the docs without running the pipeline
+        for analysis in analyses:
+            analysis.normal_doc("parser")
+            analysis.clause_doc("parser")
+        assert calls["parser"] == 4
+        with mock.patch.object(sentence_analysis, "pipe_pipeline", wraps=model_registry.pipe_pipeline) as pipe:
+            analyze_all(sentences_list)
+        pipe.assert_not_called()
+
+def test_analyze_all_batch_size():
+    with fake_models():
+        tokenizer = model_registry.get_hyphen_tokenizer()
+        stand_in = mock.Mock(pipe=mock.Mock(side_effect=tokenizer.pipe))
+        texts = [f"Bake for {i} minutes." for i in range(10)]
+        with mock.patch.object(sentence_analysis, "get_hyphen_tokenizer", return_value=stand_in), \
+                mock.patch.object(model_registry.get_model(LARGE_MODEL), "pipe", wraps=model_registry.get_model(LARGE_MODEL).pipe) as pipe:
+            analyze_all([texts], batch_size=4, profile="tagger")
+        assert stand_in.pipe.call_args.kwargs["batch_size"] == 4
+        assert pipe.call_args.kwargs["batch_size"] == 4
+        assert calls["tagger"] == 10 and calls["parser"] == 0
+
+def test_analyze_all_tokens_only():
+    with fake_models():
+        with mock.patch.object(sentence_analysis, "pipe_pipeline") as pipe:
+            analyses = analyze_all([["Mix the flour.", "Bake for 30 minutes."]], profile=None)
+        pipe.assert_not_called()
+        assert sum(calls.values()) == 0
+        assert all(analysis._tokens is not None and not analysis._large_docs for analysis in analyses)
+        assert analyses[1].tokens[0].text == "bake"
+
+def test_profile_covers():
+    assert profile_covers("parser", "tagger") and profile_covers("full", "parser") and profile_covers("tagger", "tagger")
+    assert not profile_covers("tagger", "parser") and not profile_covers("tokens-only", "tagger")
+
+def main():
+    test_parsed_once()
+    test_profile_upgrade()
+    test_tokens()
+    test_lru_bound()
+    test_analyze_all_one_pipe()
+    test_analyze_all_batch_size()
+    test_analyze_all_tokens_only()
+    test_profile_covers()
+    print("sentence analysis: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from sentence_rewriter import SentenceRewriter, SpanEdit
+
+MAPPING = {"vegetable oil": "coconut oil", "oil": "olive oil", "olive oil": "olive oil", "butter": "margarine",
+           "margarine": "butter"}
+
+def test_longest_whole_words():
+    rewriter = SentenceRewriter(MAPPING)
+    sentence, edits = rewriter.rewrite("Heat vegetable oil and olive oil; bring to a boil, then add oil.")
+    assert sentence == "Heat coconut oil and olive oil; bring to a boil, then add olive oil."
+    assert edits == [SpanEdit(5, 18, "vegetable oil", "coconut oil"), SpanEdit(60, 63, "oil", "olive oil")]
+
+def test_single_pass():
+    # a replacement is never replaced again by another mapping
+    sentence, _ = SentenceRewriter(MAPPING).rewrite("Butter the pan, then melt margarine.")
+    assert sentence == "Margarine the pan, then melt butter."
+
+def test_no_mapping():
+    assert SentenceRewriter({}).rewrite("Stir.") == ("Stir.", [])
+
+def main():
+    test_longest_whole_words()
+    test_single_pass()
+    test_no_mapping()
+    print("sentence rewriter: ok")
+
+if __name__ == "__main__":
+    main()
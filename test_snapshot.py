@@ -0,0 +1,44 @@
+import gzip
+import io
+import os
+import tarfile
+import tempfile
+
+from snapshot import iter_snapshots, read_snapshot
+
+PAGE = b"<html><head><title>Banana Cream Pie I</title></head><body></body></html>"
+
+def make_corpus() -> str:
+    corpus_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(corpus_dir, "pies"))
+    with open(os.path.join(corpus_dir, "a.html"), "wb") as f:
+        f.write(PAGE)
+    with open(os.path.join(corpus_dir, "pies", "b.html.gz"), "wb") as f:
+        f.write(gzip.compress(PAGE))
+    with open(os.path.join(corpus_dir, "notes.txt"), "wb") as f:
+        f.write(b"not a page")
+    with tarfile.open(os.path.join(corpus_dir, "crawl.tar.gz"), "w:gz") as archive:
+        for name, data in (("c.html", PAGE), ("d.htm.gz", gzip.compress(PAGE)), ("robots.txt", b"")):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return corpus_dir
+
+def test_iter_snapshots():
+    corpus_dir = make_corpus()
+    pages = list(iter_snapshots([corpus_dir]))
+    names = [os.path.relpath(name, corpus_dir) for name, _ in pages]
+    assert names == ["a.html", "crawl.tar.gz/c.html", "crawl.tar.gz/d.htm.gz", os.path.join("pies", "b.html.gz")]
+    assert all(html == PAGE for _, html in pages)
+
+def test_read_snapshot():
+    corpus_dir = make_corpus()
+    assert read_snapshot(os.path.join(corpus_dir, "pies", "b.html.gz")) == PAGE
+
+def main():
+    test_iter_snapshots()
+    test_read_snapshot()
+    print("snapshots: ok")
+
+if __name__ == "__main__":
+    main()
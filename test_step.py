@@ -0,0 +1,76 @@
+from unittest import mock
+
+import step
+from step import parse_steps
+
+# the ingredient matcher is only passed through to the stubbed to_ingredients
+MATCHER = object()
+
+def fake_to_ingredients(sentences, ingredients, matcher=None):
+    """Stands for step.to_ingredients: the names whose last word is in the sentence."""
+    return [[name for name in ingredients if name.split()[-1] in sentence.lower()] for sentence in sentences], {}
+
+def parse(sentences_list, names, previous_steps=None):
+    """Returns the steps and the sentences analyzed for their ingredients."""
+    with mock.patch.object(step, "to_ingredients", mock.Mock(side_effect=fake_to_ingredients)) as to_ingredients:
+        steps = parse_steps(sentences_list, names, MATCHER, previous_steps)
+    return steps, [sentence for call in to_ingredients.call_args_list for sentence in call.args[0]]
+
+def original_steps():
+    steps, analyzed = parse([["Mix the flour and the sugar.", "Bake for 30 minutes."], ["Let it cool."]], ["flour", "sugar"])
+    assert analyzed == ["Mix the flour and the sugar.", "Bake for 30 minutes.", "Let it cool."]
+    # as if the lazy fields had been used
+    for action in [action for original_step in steps for action in original_step.actions]:
+        action._method = ((action.sentence.split()[0].lower(),), ())
+        action._ingredients_info = {name: ("", 0, 0) for name in action.ingredients}
+    return steps
+
+def test_unchanged_recipe():
+    steps = original_steps()
+    new_steps, analyzed = parse([["Mix the flour and the sugar.", "Bake for 30 minutes."], ["Let it cool."]],
+                                ["flour", "sugar"], steps)
+    assert analyzed == []
+    assert new_steps[0] is steps[0] and new_steps[1] is steps[1]
+
+def test_changed_sentence():
+    steps = original_steps()
+    new_steps, analyzed = parse([["Mix the flour and the honey.", "Bake for 30 minutes."], ["Let it cool."]],
+                                ["flour", "sugar"], steps)
+    assert analyzed == ["Mix the flour and the honey."]
+    assert new_steps[1] is steps[1]
+    changed, unchanged = new_steps[0].actions
+    assert unchanged is steps[0].actions[1]
+    assert changed.ingredients == ["flour"] and changed._method is None and changed._ingredients_info is None
+
+def test_changed_ingredients():
+    steps = original_steps()
+    new_steps, analyzed = parse([["Mix the flour and the sugar.", "Bake for 30 minutes."], ["Let it cool."]],
+                                ["flour", "brown sugar"], steps)
+    # every sentence is linked again to the new names, the methods are kept
+    assert analyzed == ["Mix the flour and the sugar.", "Bake for 30 minutes.", "Let it cool."]
+    old_actions = [action for old_step in steps for action in old_step.actions]
+    new_actions = [action for new_step in new_steps for action in new_step.actions]
+    assert all(new is not old for new, old in zip(new_actions, old_actions))
+    assert new_actions[0].ingredients == ["flour", "brown sugar"] and new_actions[0]._ingredients_info is None
+    assert [action._method for action in new_actions] == [action._method for action in old_actions]
+
+def test_changed_step_temperature():
+    steps = original_steps()
+    new_steps, analyzed = parse([["Mix the flour and the sugar.", "Bake for 30 minutes at 350 degrees F."], ["Let it cool."]],
+                                ["flour", "sugar"], steps)
+    assert analyzed == ["Bake for 30 minutes at 350 degrees F."]
+    # same sentence in a step with another temperature: a new action reusing the ingredients info
+    mix = new_steps[0].actions[0]
+    assert mix is not steps[0].actions[0] and mix.temperature == ("350", "F")
+    assert mix._ingredients_info is steps[0].actions[0]._ingredients_info
+    assert mix._method == steps[0].actions[0]._method
+
+def main():
+    test_unchanged_recipe()
+    test_changed_sentence()
+    test_changed_ingredients()
+    test_changed_step_temperature()
+    print("step: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import random
+
+from fuzzywuzzy import fuzz
+
+from transformationDB import transformations
+from substitution_index import SubstitutionIndex
+
+def closest_match(input_key: str, substitution_list: dict):
+    """The scan over every key that find_closest_match used to do."""
+    closest, value = max(substitution_list.items(), key=lambda item: fuzz.ratio(item[0], input_key))
+    return value if fuzz.ratio(closest, input_key) > 70 else None
+
+def test_same_as_scan():
+    random.seed(0)
+    keys = [key for table in transformations.values() for key in table]
+    inputs = set(keys) | {"", "a", "Sugar", "egg yolks", "all-purpose flour", "white sugar"}
+    for _ in range(1000):
+        key = random.choice(keys)
+        i = random.randrange(len(key) + 1)
+        inputs.add(key[:i] + random.choice("abcdefghijklmnopqrstuvwxyz ") + key[i + 1:])
+    for table in transformations.values():
+        index = SubstitutionIndex(table)
+        for input_key in inputs:
+            assert index.lookup(input_key) == closest_match(input_key, table), input_key
+
+def main():
+    test_same_as_scan()
+    print("substitution index: ok")
+
+if __name__ == "__main__":
+    main()
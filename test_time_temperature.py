@@ -0,0 +1,47 @@
+from time_temperature import scan_sentence, time_seconds, temperature_fahrenheit
+
+# sentence -> ([(low, high, unit, low seconds, high seconds)], [(value, unit, fahrenheit)])
+READINGS = {
+    # ranges, and the conversion in parentheses read as part of the temperature
+    "Bake at 350 degrees F (175 degrees C) for 25 to 30 minutes.":
+        ([("25", "30", "minutes", 1500, 1800)], [("350", "F", 350)]),
+    "Reduce heat to low heat and cook 10-15 mins.": ([("10", "15", "mins", 600, 900)], [("low", "heat", None)]),
+    "Boil 10 – 12 minutes.": ([("10", "12", "minutes", 600, 720)], []),
+    "Cook 2 to 3 more minutes over medium heat.": ([("2", "3", "minutes", 120, 180)], [("medium", "heat", None)]),
+    # fractions
+    "Simmer for 1 1/2 hours.": ([("1 1/2", "1 1/2", "hours", 5400, 5400)], []),
+    "Bake at 425°F for 1/2 hour.": ([("1/2", "1/2", "hour", 1800, 1800)], [("425", "F", 425)]),
+    # degrees C converted to F
+    "Preheat the oven to 200 degrees C.": ([], [("392", "F", 392)]),
+    "Roast at 220°C for 45 min.": ([("45", "45", "min", 2700, 2700)], [("428", "F", 428)]),
+    # heat levels
+    "Cook over medium-high heat for 5 minutes.": ([("5", "5", "minutes", 300, 300)], [("medium-high", "heat", None)]),
+    "Fry on Medium Low heat.": ([], [("medium low", "heat", None)]),
+    # compound and other units
+    "Let the dough rest for a 10-minute break.": ([("10", "10", "minute", 600, 600)], []),
+    "Chill for 2 days.": ([("2", "2", "days", 172800, 172800)], []),
+    # numbers without units and "heat" as a verb are not readings
+    "Stir in 2 cups of flour.": ([], []),
+    "Heat the oil in a skillet.": ([], []),
+}
+
+def test_scan_sentence():
+    for sentence, (times, temperatures) in READINGS.items():
+        readings = scan_sentence(sentence)
+        assert [tuple(time) for time in readings.times] == times, sentence
+        assert [tuple(temperature) for temperature in readings.temperatures] == temperatures, sentence
+
+def test_step_tuples():
+    assert time_seconds(("1 1/2", "2", "Hours")) == (5400, 7200)
+    assert time_seconds(None) is None
+    assert temperature_fahrenheit(("350", "F")) == 350
+    assert temperature_fahrenheit(("medium", "heat")) is None
+    assert temperature_fahrenheit(None) is None
+
+def main():
+    test_scan_sentence()
+    test_step_tuples()
+    print("time temperature: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from transformation_cache import TransformationCache, transformations_key, snapshot_size
+
+def make_recipe(sentences_list, actions=None, ingredients=None):
+    actions = actions if actions is not None else [SimpleNamespace(sentence=s) for sentences in sentences_list for s in sentences]
+    return SimpleNamespace(sentences_list=sentences_list, tools=[], methods=([], []),
+                           steps=[SimpleNamespace(actions=actions)], ingredients=ingredients or [])
+
+def transformations(quantity=1.0, **types):
+    return dict({'quantity': quantity, 'vegan': False, 'vegetarian': False, 'italian': False, 'healthy': False}, **types)
+
+def test_key():
+    assert transformations_key(transformations(2)) == transformations_key(transformations(2.0))
+    assert transformations_key(transformations(healthy=True, vegan=True)) == (1.0, ("vegan", "healthy"))
+    assert transformations_key(transformations(0.5)) != transformations_key(transformations(1.0))
+
+def test_get_put():
+    original = make_recipe([["Melt the butter."]])
+    cache = TransformationCache(original)
+    assert cache.get(transformations()) is original
+    assert cache.get(transformations(vegan=True)) is None
+    vegan = make_recipe([["Melt the margarine."]])
+    cache.put(transformations(vegan=True), vegan)
+    assert cache.get(transformations(vegan=True)) is vegan
+    cache.put(transformations(), vegan)
+    assert cache.get(transformations()) is original
+
+def test_shared_parts_are_not_counted():
+    original = make_recipe([["Melt the butter."] * 100])
+    shared = make_recipe([["Melt the butter."] * 100], original.steps[0].actions)
+    assert snapshot_size(shared, original) < snapshot_size(original, make_recipe([]))
+
+def test_budget_evicts_least_recently_used():
+    original = make_recipe([["Melt the butter."]])
+    versions = {quantity: make_recipe([[f"Melt {quantity} cups of butter." * 20]]) for quantity in (2, 3, 4)}
+    size = snapshot_size(versions[2], original)
+    cache = TransformationCache(original, max_bytes=2 * size + size // 2)
+    cache.put(transformations(2), versions[2])
+    cache.put(transformations(3), versions[3])
+    cache.get(transformations(2))
+    cache.put(transformations(4), versions[4])
+    assert len(cache) == 2
+    assert cache.get(transformations(3)) is None
+    assert cache.get(transformations(2)) is versions[2]
+    assert cache.total_bytes <= cache.max_bytes
+    cache = TransformationCache(original, max_bytes=size // 2)
+    cache.put(transformations(2), versions[2])
+    assert len(cache) == 0
+
+def main():
+    test_key()
+    test_get_put()
+    test_shared_parts_are_not_counted()
+    test_budget_evicts_least_recently_used()
+    print("transformation cache: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+from copy import copy
+from unittest import mock
+
+import pytest
+
+import recipe
+import step
+from ingredient import RawIngredient
+from recipe import Recipe
+from transformationDB import transformations
+from transformation import resolve_mapping, transform_ingredient
+from transformation_plan import TransformationPlan
+
+MAPPINGS = {"butter": "unsalted butter", "chicken": "chicken breasts", "sugar": "white sugar", "eggs": "eggs",
+            "milk": "whole milk", "bacon": "bacon", "parmesan": "parmesan cheese"}
+
+def test_precedence():
+    plan = TransformationPlan.from_transformations({'quantity': 2.0, 'vegan': False, 'vegetarian': True,
+                                                    'italian': False, 'healthy': True})
+    assert plan.types == ["vegetarian", "healthy"]
+    assert plan.quantity == 2.0
+    assert TransformationPlan(["healthy", "vegan"]).types == ["vegan", "healthy"]
+    assert TransformationPlan([]).is_identity()
+    with pytest.raises(ValueError):
+        TransformationPlan(["keto"])
+    with pytest.raises(ValueError):
+        TransformationPlan([], 0.0)
+
+def test_single_table_same_as_resolve_mapping():
+    for transformation_type, table in transformations.items():
+        plan = TransformationPlan([transformation_type])
+        assert plan.substitutions(MAPPINGS) == resolve_mapping(table, MAPPINGS)
+
+def test_tables_are_chained():
+    plan = TransformationPlan(["vegan", "healthy"])
+    for name in ["bacon", "butter", "cream", "white sugar", "sour cream"]:
+        expected = transform_ingredient(transform_ingredient(name, transformations["vegan"]), transformations["healthy"])
+        assert plan.substitute_name(name, {}) == expected
+
+def fake_to_ingredients(sentences, ingredients, matcher=None):
+    """Stands for step.to_ingredients: the names whose last word is in the sentence."""
+    return [[name for name in ingredients if name.split()[-1] in sentence.lower()] for sentence in sentences], {}
+
+def fake_find_method(sentences):
+    return [[sentence.split()[0].lower()] for sentence in sentences], [[] for _ in sentences]
+
+@contextmanager
+def without_models():
+    with mock.patch.object(recipe, "analyze_all"), mock.patch.object(recipe, "IngredientMatcher"), \
+            mock.patch.object(step, "to_ingredients", fake_to_ingredients), mock.patch.object(step, "findMethod", fake_find_method):
+        yield
+
+def make_recipe() -> Recipe:
+    raw_ingredients = [RawIngredient("2 cups flour", "2", "cups", "flour"), RawIngredient("1 cup sugar", "1", "cup", "sugar"),
+                       RawIngredient("1 cup milk", "1", "cup", "milk")]
+    raw_steps = ["Mix the flour and the sugar. Bake for 30 minutes.", "Pour the milk in a bowl."]
+    with without_models():
+        return Recipe.from_raw("Cake", raw_ingredients, raw_steps)
+
+def snapshot(original):
+    """What transformed must leave unchanged in the original recipe."""
+    return ([list(sentences) for sentences in original.sentences_list], list(original.ingredients_names),
+            [(ingredient, ingredient.name, ingredient.string) for ingredient in original.ingredients],
+            [(original_step, list(original_step.actions)) for original_step in original.steps],
+            [(action.sentence, action.ingredients) for original_step in original.steps for action in original_step.actions])
+
+def test_transformed_shares_unchanged_sentences():
+    original = make_recipe()
+    before = snapshot(original)
+    new_sentences_list = [["Mix the flour and the sugar.", "Bake for 60 minutes."], list(original.sentences_list[1])]
+    with without_models():
+        transformed = original.transformed(new_sentences_list, list(original.ingredients), modification="twice as long")
+    assert snapshot(original) == before
+    assert transformed.steps[1] is original.steps[1]
+    assert transformed.steps[0] is not original.steps[0]
+    mix, bake = transformed.steps[0].actions
+    assert mix is original.steps[0].actions[0]
+    assert bake is not original.steps[0].actions[1] and bake.sentence == "Bake for 60 minutes."
+    assert all(new is old for new, old in zip(transformed.ingredients, original.ingredients))
+    assert original.recipe_name == "Cake" and transformed.recipe_name == "Cake ( twice as long )"
+
+def test_transformed_shares_unchanged_ingredients():
+    original = make_recipe()
+    before = snapshot(original)
+    soy_milk = copy(original.ingredients[2])
+    soy_milk.update_name("soy milk")
+    new_sentences_list = [list(original.sentences_list[0]), ["Pour the soy milk in a bowl."]]
+    with without_models():
+        transformed = original.transformed(new_sentences_list, original.ingredients[:2] + [soy_milk])
+    assert snapshot(original) == before
+    assert original.ingredients[2].name == "milk" and transformed.ingredients_names == ["flour", "sugar", "soy milk"]
+    assert transformed.ingredients[0] is original.ingredients[0] and transformed.ingredients[1] is original.ingredients[1]
+    assert transformed.ingredients[2] is not original.ingredients[2]
+    # other ingredient names: every action is linked again, nothing is shared
+    new_actions = [action for new_step in transformed.steps for action in new_step.actions]
+    old_actions = [action for old_step in original.steps for action in old_step.actions]
+    assert all(new is not old for new, old in zip(new_actions, old_actions))
+    assert new_actions[2].ingredients == ["soy milk"] and old_actions[2].ingredients == ["milk"]
+
+def main():
+    test_precedence()
+    test_single_table_same_as_resolve_mapping()
+    test_tables_are_chained()
+    test_transformed_shares_unchanged_sentences()
+    test_transformed_shares_unchanged_ingredients()
+    print("transformation plan: ok")
+
+if __name__ == "__main__":
+    main()
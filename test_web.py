@@ -0,0 +1,161 @@
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+from http_cache import HttpCache
+import web
+from web import fetch_many
+
+PAGE = b"<html><head><title>Banana Cream Pie I</title></head><body></body></html>"
+ETAG = '"v1"'
+LAST_MODIFIED = formatdate(0, usegmt=True)
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Stand-in for allrecipes: serves PAGE with an ETag and answers 304 to matching conditional requests."""
+    requests_seen = []
+    active = 0
+    max_active = 0
+    delay = 0.0
+    content_type_header = "Content-Type"
+    lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        with StandInHandler.lock:
+            StandInHandler.requests_seen.append(dict(self.headers))
+            StandInHandler.active += 1
+            StandInHandler.max_active = max(StandInHandler.max_active, StandInHandler.active)
+        try:
+            time.sleep(StandInHandler.delay)
+            self.respond()
+        finally:
+            with StandInHandler.lock:
+                StandInHandler.active -= 1
+
+    def respond(self) -> None:
+        if self.headers.get("If-None-Match") == ETAG or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header(StandInHandler.content_type_header, "text/html; charset=utf-8")
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+def start_server() -> HTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_conditional_get():
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_port}/recipe/12151/banana-cream-pie-i/"
+    cache = HttpCache(tempfile.mkdtemp())
+    StandInHandler.requests_seen = []
+    try:
+        first = cache.get(url)
+        second = cache.get(url)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert first.content == PAGE and not first.from_cache
+    assert second.content == PAGE and second.from_cache
+    assert "If-None-Match" not in StandInHandler.requests_seen[0]
+    assert StandInHandler.requests_seen[1]["If-None-Match"] == ETAG
+    assert StandInHandler.requests_seen[1]["If-Modified-Since"] == LAST_MODIFIED
+
+def test_lowercase_headers():
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_port}/recipe/12151/banana-cream-pie-i/"
+    cache = HttpCache(tempfile.mkdtemp())
+    StandInHandler.content_type_header = "content-type"
+    try:
+        first = cache.get(url)
+        second = cache.get(url)
+    finally:
+        StandInHandler.content_type_header = "Content-Type"
+        server.shutdown()
+        server.server_close()
+    # web.get_recipe_parts_from_url reads the charset from "Content-Type"
+    assert first.headers.get("Content-Type") == "text/html; charset=utf-8"
+    assert second.from_cache and second.headers.get("content-type") == "text/html; charset=utf-8"
+
+def test_offline_mode():
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_port}/recipe/12151/banana-cream-pie-i/"
+    cache_dir = tempfile.mkdtemp()
+    try:
+        HttpCache(cache_dir).get(url)
+    finally:
+        server.shutdown()
+        server.server_close()
+    # the server is down now: both the offline mode and the network error fallback serve the cached body
+    assert HttpCache(cache_dir, offline=True).get(url).content == PAGE
+    assert HttpCache(cache_dir, timeout=1.0).get(url).content == PAGE
+    try:
+        HttpCache(cache_dir, offline=True).get(url + "other/")
+        assert False, "offline mode should fail for a url that was never fetched"
+    except Exception as e:
+        assert "Offline mode" in str(e)
+
+def test_fetch_many():
+    server = start_server()
+    # the path makes the stand-in urls pass web.valid_url
+    urls = [f"http://127.0.0.1:{server.server_port}/www.allrecipes.com/recipe/{i}/" for i in range(12)]
+    urls.append("https://example.com/not-a-recipe/")
+    StandInHandler.max_active = 0
+    StandInHandler.delay = 0.05
+    try:
+        results = fetch_many(urls, max_workers=8, max_per_host=3, http_cache=HttpCache(tempfile.mkdtemp()))
+    finally:
+        StandInHandler.delay = 0.0
+        server.shutdown()
+        server.server_close()
+    assert [title for _, title in results[:-1]] == ["Banana Cream Pie I"] * 12
+    assert isinstance(results[-1], Exception)
+    assert 1 < StandInHandler.max_active <= 3
+
+class ClosingSession(requests.Session):
+    """Session remembering whether it was closed."""
+    closed = False
+
+    def close(self) -> None:
+        self.closed = True
+        super().close()
+
+def test_fetch_many_closes_its_session():
+    server = start_server()
+    urls = [f"http://127.0.0.1:{server.server_port}/www.allrecipes.com/recipe/{i}/" for i in range(3)]
+    created = ClosingSession()
+    given = ClosingSession()
+    try:
+        with mock.patch.object(web, "make_session", return_value=created):
+            fetch_many(urls, http_cache=HttpCache(tempfile.mkdtemp()))
+        results = fetch_many(urls, session=given, http_cache=HttpCache(tempfile.mkdtemp()))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert created.closed
+    # the caller's session stays open for its next requests
+    assert not given.closed and [title for _, title in results] == ["Banana Cream Pie I"] * 3
+
+def main():
+    test_conditional_get()
+    test_lowercase_headers()
+    test_offline_mode()
+    test_fetch_many()
+    test_fetch_many_closes_its_session()
+    print("http cache: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import re
+from fractions import Fraction
+from typing import List, NamedTuple, Optional, Tuple
+
+from sentence_helper import celsius_to_fahren
+
+SECONDS_PER_UNIT = {
+    "second": 1, "seconds": 1, "sec": 1, "secs": 1, "minute": 60, "minutes": 60, "min": 60, "mins": 60,
+    "hour": 3600, "hours": 3600, "hr": 3600, "hrs": 3600, "day": 86400, "days": 86400,
+}
+
+NUMBER = r"\d+(?:\.\d+)?(?:\s+\d+/\d+)?|\d+/\d+"
+# one alternation for the three kinds of readings, each (lowercased) sentence is scanned once
+SCAN_RE = re.compile(
+    # every reading starts a word with a digit or a heat level: other positions are skipped at once
+    r"\b(?=[\dlmh])(?:"
+    # 350 degrees F (175 degrees C), 350°F, 200 degrees C: the conversion in parentheses is part of the reading
+    rf"(?P<degrees>\d+)\s*(?:degrees?|°)(?:\s*(?P<scale>fahrenheit|celsius|[fc])\b)?"
+    rf"(?:\s*\(\s*\d+\s*(?:degrees?|°)\s*(?:fahrenheit|celsius|[fc])\b\s*\))?"
+    # medium-high heat, medium low heat
+    rf"|(?P<heat>(?:medium[- ])?(?:low|high)|medium)\s+heat"
+    # 10 minutes, 10 to 15 more minutes, 1 1/2 hours, 10-minute
+    rf"|(?P<low>{NUMBER})(?:\s*(?:to|-|–)\s*(?P<high>{NUMBER}))?[\s-]*(?:[a-z]+\s+){{0,2}}?"
+    rf"(?P<unit>minutes?|mins?|hours?|hrs?|seconds?|secs?|days?)\b)",
+)
+
+class TimeReading(NamedTuple):
+    low: str
+    high: str
+    unit: str
+    low_seconds: float
+    high_seconds: float
+
+class TemperatureReading(NamedTuple):
+    value: str            # "350", or the heat level as written ("medium")
+    unit: str             # "F" or "heat"
+    fahrenheit: Optional[float]   # None for heat levels
+
+class SentenceReadings(NamedTuple):
+    times: List[TimeReading]
+    temperatures: List[TemperatureReading]
+
+def parse_number(text: str) -> float:
+    if "/" not in text:
+        return float(text)
+    return float(sum(Fraction(part) for part in text.split()))
+
+def fahrenheit_str(fahrenheit: float) -> str:
+    return str(round(fahrenheit))
+
+def scan_sentence(sentence: str) -> SentenceReadings:
+    """
+    Returns the times and the temperatures (oven degrees or heat levels) of a sentence, in order, in one scan.
+
+    Heat levels and time units are lowercased.
+    """
+    times = []
+    temperatures = []
+    for degrees, scale, heat, low, high, unit in SCAN_RE.findall(sentence.lower()):
+        if degrees:
+            fahrenheit = celsius_to_fahren(degrees) if scale.startswith("c") else float(degrees)
+            temperatures.append(TemperatureReading(fahrenheit_str(fahrenheit), "F", fahrenheit))
+        elif heat:
+            temperatures.append(TemperatureReading(heat, "heat", None))
+        else:
+            high = high or low
+            seconds = SECONDS_PER_UNIT[unit]
+            times.append(TimeReading(low, high, unit, parse_number(low) * seconds, parse_number(high) * seconds))
+    return SentenceReadings(times, temperatures)
+
+def time_seconds(time: Optional[Tuple[str, str, str]]) -> Optional[Tuple[float, float]]:
+    """Returns the (low, high) seconds of a step.TimeType tuple."""
+    if time is None:
+        return None
+    low, high, unit = time
+    seconds = SECONDS_PER_UNIT[unit.lower()]
+    return parse_number(low) * seconds, parse_number(high) * seconds
+
+def temperature_fahrenheit(temperature: Optional[Tuple[str, str]]) -> Optional[float]:
+    """Returns the degrees F of a step.TemperatureType tuple, or None for heat levels."""
+    if temperature is None or temperature[1] != "F":
+        return None
+    return float(temperature[0])
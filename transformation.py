@@ -1,23 +1,25 @@
-from fuzzywuzzy import fuzz
 from transformationDB import transformations
-from typing import List, Tuple
+from substitution_index import get_substitution_index
+from sentence_rewriter import SentenceRewriter, SpanEdit
+from typing import Dict, List, Tuple
 from ingredient import Ingredient
 from step import parse_original_ingredients
 
 from typing import List, Tuple
-from copy import deepcopy
+from copy import copy
 
 from ingredient import Ingredient
 
 def transform_recipe_type(recipe, transformation_type: str) -> Tuple[List[List[str]], List[Ingredient]]:
-    sentences_list = deepcopy(recipe.sentences_list)  # List[List[str]]
-    ingredients_list = deepcopy(recipe.ingredients)   # List[Ingredient]
+    # not copied: the rewrite makes new lists and only the substituted ingredients are copied
+    sentences_list = recipe.sentences_list  # List[List[str]]
+    ingredients_list = recipe.ingredients   # List[Ingredient]
     ingredient_names= recipe.ingredients_names 
     transformation_dict=transformations[transformation_type]
 
     # print("ingredient_list: ", ingredients_list)
 
-    ingredient_mappings=parse_original_ingredients(sentences_list, ingredient_names)
+    ingredient_mappings=parse_original_ingredients(sentences_list, ingredient_names, recipe.ingredient_matcher)
 
     # print("mappings: ", ingredient_mappings)
     new_sentences_list=transform_sentence_list( sentences_list,transformation_dict,ingredient_mappings)
@@ -28,41 +30,60 @@ def transform_recipe_type(recipe, transformation_type: str) -> Tuple[List[List[s
 
 def transform_ingredient_list(ingredient_list:List[Ingredient], transformation_dict:dict, ingredient_mappings:dict):
     # modify self.name, self.preparation??
+    # the ingredients are shared with the recipe: only the substituted ones are copied before being updated
     new_ingredients_list=[]
     for ingredient in ingredient_list:
         new_ingredient= ingredient
         # find matching ingredient in transformations
         matching_ingredient = transform_ingredient(ingredient.name,transformation_dict)
         if matching_ingredient!=ingredient.name:
+            new_ingredient = copy(ingredient)
             new_ingredient.update_name(matching_ingredient)
         elif ingredient.name in ingredient_mappings.values():
             raw_name=get_first_key_by_value(ingredient_mappings, ingredient.name)
             match_from_original= transform_ingredient(raw_name,transformation_dict)
             if match_from_original!=ingredient.name:
+                new_ingredient = copy(ingredient)
                 new_ingredient.update_name(match_from_original)
 
         new_ingredients_list.append(new_ingredient)
     return new_ingredients_list
 
-# transformation for sentence list
-def transform_sentence_list( sentence_list,transformation_dict, ingredient_mappings:dict):
-    new_sentence_list = []
+def resolve_mapping(transformation_dict: dict, ingredient_mappings: dict) -> Dict[str, str]:
+    """
+    Returns the substitution of every official and raw ingredient name of the recipe (unchanged names included).
+
+    Like transform_ingredient_list, an official name without substitution takes the one of its raw name.
+    """
+    mapping = {}
+    for key, value in ingredient_mappings.items():
+        if value not in mapping:
+            substitution = transform_ingredient(value, transformation_dict)
+            if substitution == value:
+                substitution = transform_ingredient(get_first_key_by_value(ingredient_mappings, value), transformation_dict)
+            mapping[value] = substitution
+        if key not in mapping:
+            mapping[key] = transform_ingredient(key, transformation_dict)
+    return mapping
+
+def compile_rewriter(transformation_dict: dict, ingredient_mappings: dict) -> SentenceRewriter:
+    """Compiles the substitutions of a recipe's ingredients into a single-pass rewriter."""
+    return SentenceRewriter(resolve_mapping(transformation_dict, ingredient_mappings))
 
+def rewrite_sentence_list(sentence_list: List[List[str]], rewriter: SentenceRewriter) -> Tuple[List[List[str]], List[List[List[SpanEdit]]]]:
+    """Returns the rewritten sentences and the edits made in each sentence."""
+    new_sentence_list = []
+    edits_list = []
     for step in sentence_list:
-        step_list = []
-        for sentence in step:
-            new_sentence = sentence
-            for key, value in ingredient_mappings.items():
-                from_official_name = transform_ingredient(value, transformation_dict)
-                new_sentence = new_sentence.replace(value, from_official_name)
-                
-                from_raw_name = transform_ingredient(key, transformation_dict)
-                new_sentence = new_sentence.replace(key, from_raw_name)
-            step_list.append(new_sentence)
-        new_sentence_list.append(step_list)
-
-    # print("new: ", new_sentence_list, sentence_list)
-    return new_sentence_list
+        rewritten = [rewriter.rewrite(sentence) for sentence in step]
+        new_sentence_list.append([new_sentence for new_sentence, _ in rewritten])
+        edits_list.append([edits for _, edits in rewritten])
+    return new_sentence_list, edits_list
+
+# transformation for sentence list
+def transform_sentence_list( sentence_list,transformation_dict, ingredient_mappings:dict):
+    # one pass per sentence, longest ingredient names first and whole words only
+    return rewrite_sentence_list(sentence_list, compile_rewriter(transformation_dict, ingredient_mappings))[0]
         
 def transform_ingredient(ingredient, transformation_dict):
     matching_ingredient = find_closest_match(ingredient, transformation_dict)
@@ -71,15 +92,9 @@ def transform_ingredient(ingredient, transformation_dict):
     else:
         return ingredient
 def find_closest_match(input_key, substitution_list):
-    closest_match, match_val= max(substitution_list.items(), key=lambda x: fuzz.ratio(x[0], input_key))
-    
-    # You can adjust the threshold based on your preferences\
-    similarity=fuzz.ratio(closest_match, input_key)
-    # print("test??", input_key, ",", closest_match,",", match_val, similarity )
-    if similarity > 70:
-        return match_val
-    else:
-        return None
+    # value of the key with the highest fuzz.ratio if above substitution_index.SIMILARITY_THRESHOLD, else None
+    # (the index of each table skips keys that can't be close enough and remembers the results)
+    return get_substitution_index(substitution_list).lookup(input_key)
 
 def get_first_key_by_value(dictionary, target_value):
     for key, value in dictionary.items():
@@ -0,0 +1,82 @@
+import io
+import pickle
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ingredient_matcher import IngredientMatcher
+from transformation_plan import TYPE_PRECEDENCE
+
+# memory budget of the transformed versions of one recipe
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+# (quantity, transformation types in precedence order)
+TransformationsKey = Tuple[float, Tuple[str, ...]]
+
+def transformations_key(transformations_dict: Dict) -> TransformationsKey:
+    """
+    Normalizes a RecipeStateMachine transformations dict: 2 and 2.0 are the same quantity, and the types are
+    the selected ones in TYPE_PRECEDENCE order.
+    """
+    quantity = round(float(transformations_dict.get('quantity', 1.0)), 9)
+    types = tuple(transformation_type for transformation_type in TYPE_PRECEDENCE if transformations_dict.get(transformation_type))
+    return quantity, types
+
+class SizePickler(pickle.Pickler):
+    """Pickler leaving out the ingredient matchers the actions keep until their lazy fields are computed."""
+    def persistent_id(self, obj):
+        return "matcher" if isinstance(obj, IngredientMatcher) else None
+
+def snapshot_size(recipe, original) -> int:
+    """
+    Estimated bytes a transformed snapshot adds to its original (see Recipe.transformed): the pickled size of
+    its sentences, tools and of the actions and ingredients it doesn't share with the original.
+    """
+    shared_actions = {id(action) for step in original.steps for action in step.actions}
+    shared_ingredients = {id(ingredient) for ingredient in original.ingredients}
+    new_actions = [action for step in recipe.steps for action in step.actions if id(action) not in shared_actions]
+    new_ingredients = [ingredient for ingredient in recipe.ingredients if id(ingredient) not in shared_ingredients]
+    buffer = io.BytesIO()
+    SizePickler(buffer, pickle.HIGHEST_PROTOCOL).dump((recipe.sentences_list, recipe.tools, new_actions, new_ingredients))
+    return len(buffer.getvalue())
+
+class TransformationCache:
+    """
+    Transformed versions of one original recipe, keyed by their normalized transformations, so a combination
+    seen before (toggling a transformation, reverting and reapplying) is found again without any parsing.
+
+    The least recently used versions are evicted once their estimated size (snapshot_size) goes over max_bytes.
+    The original recipe is the version without transformations and is always kept.
+    """
+    def __init__(self, original, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.original = original
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries: "OrderedDict[TransformationsKey, Tuple[object, int]]" = OrderedDict()
+
+    def get(self, transformations_dict: Dict) -> Optional[object]:
+        key = transformations_key(transformations_dict)
+        if key == (1.0, ()):
+            return self.original
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, transformations_dict: Dict, recipe) -> None:
+        key = transformations_key(transformations_dict)
+        if key == (1.0, ()):
+            return
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[1]
+        size = snapshot_size(recipe, self.original)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (recipe, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def __len__(self) -> int:
+        return len(self.entries)
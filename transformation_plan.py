@@ -0,0 +1,89 @@
+from copy import copy
+from typing import Dict, List, Tuple
+
+from transformationDB import transformations
+from ingredient import Ingredient
+from step import parse_original_ingredients
+from quantity_transformation import transform_quantity
+from transformation import transform_ingredient, get_first_key_by_value, rewrite_sentence_list
+from sentence_rewriter import SentenceRewriter
+
+# order in which the substitution tables of a plan are chained: a name substituted by one table is looked up
+# in the next ones (the order main.py applied them in)
+TYPE_PRECEDENCE = ("vegan", "vegetarian", "italian", "healthy")
+
+class TransformationPlan:
+    """
+    All the transformations selected for a recipe, applied to the original recipe at once: the quantities are
+    scaled first, then the ingredient names are substituted through the selected tables (chained in
+    TYPE_PRECEDENCE order) in one rewrite per sentence, and the recipe is parsed again only once.
+    """
+    def __init__(self, types: List[str], quantity: float = 1.0) -> None:
+        for transformation_type in types:
+            if transformation_type not in TYPE_PRECEDENCE:
+                raise ValueError(f"Unknown transformation type: {transformation_type}")
+        if quantity <= 0.0:
+            raise ValueError("quantity should be greater than 0.0")
+        self.types = [transformation_type for transformation_type in TYPE_PRECEDENCE if transformation_type in types]
+        self.quantity = quantity
+        self.tables = [transformations[transformation_type] for transformation_type in self.types]
+
+    @classmethod
+    def from_transformations(cls, transformations_dict: Dict) -> "TransformationPlan":
+        """Creates the plan of a RecipeStateMachine transformations dict ({'quantity': 2.0, 'vegan': True, ...})."""
+        types = [transformation_type for transformation_type in TYPE_PRECEDENCE if transformations_dict.get(transformation_type)]
+        return cls(types, transformations_dict.get('quantity', 1.0))
+
+    def is_identity(self) -> bool:
+        return not self.types and self.quantity == 1.0
+
+    def substitute_name(self, name: str, ingredient_mappings: Dict[str, str]) -> str:
+        """
+        Returns the name after every table of the plan. Like transform_ingredient_list, an official name without
+        substitution takes the one of its raw name.
+        """
+        for table in self.tables:
+            substitution = transform_ingredient(name, table)
+            if substitution == name and name in ingredient_mappings.values():
+                substitution = transform_ingredient(get_first_key_by_value(ingredient_mappings, name), table)
+            name = substitution
+        return name
+
+    def substitutions(self, ingredient_mappings: Dict[str, str]) -> Dict[str, str]:
+        """Returns the final substitution of every official and raw ingredient name (unchanged names included)."""
+        mapping = {}
+        for key, value in ingredient_mappings.items():
+            if value not in mapping:
+                mapping[value] = self.substitute_name(value, ingredient_mappings)
+            if key not in mapping:
+                mapping[key] = self.substitute_name(key, ingredient_mappings)
+        return mapping
+
+    def plan_recipe(self, recipe) -> Tuple[List[List[str]], List[Ingredient]]:
+        """Returns the sentences and ingredients of the recipe with every transformation of the plan."""
+        sentences_list, ingredients_list = transform_quantity(recipe, self.quantity)
+        if not self.tables:
+            return sentences_list, ingredients_list
+        # scaling only changes numbers: the names are linked on the recipe as it is
+        ingredient_mappings = parse_original_ingredients(recipe.sentences_list, recipe.ingredients_names, recipe.ingredient_matcher)
+        mapping = self.substitutions(ingredient_mappings)
+        sentences_list = rewrite_sentence_list(sentences_list, SentenceRewriter(mapping))[0]
+        for i, ingredient in enumerate(ingredients_list):
+            new_name = mapping.get(ingredient.name)
+            if new_name is None:
+                new_name = self.substitute_name(ingredient.name, ingredient_mappings)
+            if new_name != ingredient.name:
+                # the unchanged ingredients are shared with the recipe
+                ingredients_list[i] = copy(ingredient)
+                ingredients_list[i].update_name(new_name)
+        return sentences_list, ingredients_list
+
+    def transformed(self, recipe, modification: str = ''):
+        """
+        Returns the transformed snapshot of the (original) recipe, with a single re-parse (see
+        Recipe.transformed). The recipe itself is returned if the plan changes nothing.
+        """
+        if self.is_identity():
+            return recipe
+        new_sentences_list, new_ingredients = self.plan_recipe(recipe)
+        return recipe.transformed(new_sentences_list, new_ingredients, modification=modification)
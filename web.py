@@ -1,24 +1,97 @@
+import threading
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from bs4.element import Tag
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+
+from http_cache import HttpCache, get_http_cache
+from extraction import RecipeParts, extract_recipe_parts, charset_from_content_type
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_MAX_PER_HOST = 4
+DEFAULT_TIMEOUT = 15.0
 
 def valid_url(url: str) -> bool:
     return "www.allrecipes.com/" in url
 
-def get_soup_from_url(url: str) -> Tuple[BeautifulSoup, str]:
-    """Returns a BeautifulSoup object and the website title from the given url. If error or the url is invalid, raise exception."""
+def get_soup_from_url(url: str, session: Optional[requests.Session] = None, timeout: Optional[float] = None,
+                      http_cache: Optional[HttpCache] = None) -> Tuple[BeautifulSoup, str]:
+    """
+    Returns a BeautifulSoup object and the website title from the given url. If error or the url is invalid, raise exception.
+    
+    Pass a session to reuse its pooled keep-alive connections.
+    """
     if not valid_url(url):
         raise Exception("Invalid url. url must contain 'www.allrecipes.com/'")
     
     try:
-        r = requests.get(url)
+        # conditional request, served from the local http cache if the page didn't change
+        http_cache = http_cache if http_cache is not None else get_http_cache()
+        r = http_cache.get(url, session=session, timeout=timeout)
         soup = BeautifulSoup(r.content, "html.parser")
         title = soup.find('title').get_text()
         return soup, title
     except Exception as e:
         raise Exception(f"Error when getting soup from url: {url}, error: {e}")
 
+def get_recipe_parts_from_url(url: str, session: Optional[requests.Session] = None, timeout: Optional[float] = None,
+                              http_cache: Optional[HttpCache] = None, backend: Optional[str] = None) -> RecipeParts:
+    """
+    Returns the title, the raw ingredients and the step texts of the recipe at the given url. If error or the url is invalid, raise exception.
+    
+    Faster than get_soup_from_url + get_raw_*_from_soup: only the needed nodes are extracted (see extraction.py).
+    """
+    if not valid_url(url):
+        raise Exception("Invalid url. url must contain 'www.allrecipes.com/'")
+    
+    http_cache = http_cache if http_cache is not None else get_http_cache()
+    try:
+        r = http_cache.get(url, session=session, timeout=timeout)
+    except Exception as e:
+        raise Exception(f"Error when getting page from url: {url}, error: {e}")
+    return extract_recipe_parts(r.content, charset_from_content_type(r.headers.get("Content-Type")), backend)
+
+def make_session(pool_size: int = DEFAULT_MAX_WORKERS) -> requests.Session:
+    """Returns a session keeping up to pool_size keep-alive connections per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_many(urls: List[str], max_workers: int = DEFAULT_MAX_WORKERS, max_per_host: int = DEFAULT_MAX_PER_HOST,
+               timeout: float = DEFAULT_TIMEOUT, session: Optional[requests.Session] = None,
+               http_cache: Optional[HttpCache] = None) -> List[Union[Tuple[BeautifulSoup, str], Exception]]:
+    """
+    Fetches the urls concurrently with get_soup_from_url on a thread pool sharing one connection pool.
+    
+    At most max_per_host requests run at the same time against a given host. Returns the (soup, title) of each url
+    in the order of urls, or the exception raised for it, so that one bad page doesn't stop the batch.
+    A session created here is closed at the end of the batch, a given session is left open.
+    """
+    host_slots: Dict[str, threading.BoundedSemaphore] = {}
+    host_slots_lock = threading.Lock()
+
+    def fetch(url: str) -> Union[Tuple[BeautifulSoup, str], Exception]:
+        host = urlsplit(url).netloc
+        with host_slots_lock:
+            slot = host_slots.setdefault(host, threading.BoundedSemaphore(max_per_host))
+        try:
+            with slot:
+                return get_soup_from_url(url, session=session, timeout=timeout, http_cache=http_cache)
+        except Exception as e:
+            return e
+
+    with ExitStack() as stack:
+        if session is None:
+            session = stack.enter_context(make_session(max_workers))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(fetch, urls))
+
 def get_raw_ingredients_from_soup(soup: BeautifulSoup) -> List[Tag]:
     """Returns a list of raw ingredients from the given soup. If not found, raise exception."""
     raw_ingredients = soup.select("#mntl-structured-ingredients_1-0 > ul > li > p")